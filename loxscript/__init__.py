@@ -0,0 +1,15 @@
+# The embedding API is only imported when it's used, so that commands which don't
+# need the interpreter (like `loxscript.client`) start quickly.
+__all__ = ["Program", "ScriptError", "compile"]
+
+
+def __getattr__(name: str):
+    if name == "ScriptError":
+        from .errors import ScriptError
+
+        return ScriptError
+    if name in ("Program", "compile"):
+        from . import program
+
+        return getattr(program, name)
+    raise AttributeError(f"module 'loxscript' has no attribute '{name}'")
@@ -1,34 +1,15 @@
+import argparse
 import sys
 import typing as t
+from contextlib import ExitStack
 from pathlib import Path
 
-from loxscript.interpreter.resolver import Resolver
-from loxscript.lexer.scanner import Scanner
-from loxscript.parser.parser import Parser
+from .app import App
+from .interpreter.ffi import DEFAULT_PYTHON_MODULES
 
-from .handle_errors import has_any_error, update_error, has_error, has_runtime_error
-from .interpreter.interpreter import Interpreter
 
-
-class App:
-    def __init__(self):
-        self._interpreter = Interpreter()
-
-    def __call__(self, source):
-        token_list = Scanner(source=source).get_tokens()
-        statements = Parser(token_list).parse()
-        if has_any_error():
-            return
-        resolver = Resolver(self._interpreter)
-        resolver.resolve(statements)
-        if has_any_error():
-            return
-
-        self._interpreter.interpret(statements)
-
-
-def run_repl():
-    run = App()
+def run_repl(python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES):
+    run = App(python_modules)
     print("-------------LoxScript REPL--------------")
     print("Press `Ctrl+D` to exit")
     print(
@@ -44,7 +25,7 @@ def run_repl():
                 while not code.endswith("}"):
                     code += input("(block)>> ")
             run(code)
-            update_error(False, False)
+            run.errors.reset()
 
         except EOFError:
             print("\nExiting")
@@ -53,19 +34,111 @@ def run_repl():
             print("\nKeyboardInterrupt")
 
 
-def run_file(fp: str):
+def run_file(
+    fp: str,
+    python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES,
+    jobs: int = 1,
+    profile: t.Optional[str] = None,
+    profile_interval: float = 0.005,
+    stats: bool = False,
+    coverage: t.Optional[str] = None,
+):
     try:
         code = Path(fp).read_text()
     except FileNotFoundError:
         print(f"File '{fp}' doesn't exists.")
         sys.exit(1)
-    run = App()
-    run(source=code)
-
-    if has_runtime_error():
-        sys.exit(70)
-    if has_error():
-        sys.exit(65)
+    # Modules are imported relative to the script
+    run = App(python_modules, directory=Path(fp).parent, jobs=jobs, path=Path(fp))
+    # Only imported when they are used
+    profiler = counters = None
+    if profile is not None:
+        from .profiler import Profiler
+
+        profiler = Profiler(profile_interval, script=Path(fp).name)
+    if stats:
+        from .stats import Stats
+
+        counters = Stats()
+    collector = None
+    if coverage is not None:
+        from .coverage import Coverage
+
+        collector = Coverage()
+        collector.install(run.interpreter)
+    try:
+        with ExitStack() as stack:
+            for tool in (profiler, counters):
+                if tool is not None:
+                    stack.enter_context(tool)
+            run(source=code)
+    finally:
+        # Also when the script calls `exit`
+        if profiler is not None:
+            profiler.write_collapsed(profile)
+            profiler.report(sys.stderr)
+        if counters is not None:
+            counters.report(sys.stderr)
+        if collector is not None:
+            collector.save(coverage)
+            collector.report(sys.stderr)
+
+    if run.errors.exit_code():
+        sys.exit(run.errors.exit_code())
+
+
+def _argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="loxscript", description="Runs a script or starts the REPL."
+    )
+    parser.add_argument("script", nargs="?", help="script to run")
+    parser.add_argument(
+        "--allow-python",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="python module (or `module.attribute`) scripts may import with "
+        "`pyimport`, could be given multiple times. "
+        f"Always allowed: {', '.join(DEFAULT_PYTHON_MODULES)}",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="compile the imported modules in N processes before running the "
+        "script, 0 for one per core",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="sample the lox call stack while the script runs, write the stacks "
+        "to FILE in the collapsed format of flamegraph tools and print the time "
+        "spent in each function",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=5.0,
+        metavar="MS",
+        help="milliseconds between samples with --profile (default: 5)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="count the nodes evaluated, calls and allocations and print the "
+        "counts when the script ends",
+    )
+    parser.add_argument(
+        "--coverage",
+        nargs="?",
+        const="loxcoverage",
+        metavar="DIR",
+        help="record the statements and branches that run, and write the data "
+        "and annotated sources to DIR (default: loxcoverage)",
+    )
+    return parser
 
 
 def main(
@@ -73,13 +146,33 @@ def main(
 ):  # For debugging purposes, args could be provided directly
     if not args:
         args = sys.argv
-    if len(args) > 2:
-        print("Usage: pylox SCRIPT")
-        sys.exit(1)
-    if len(args) == 2:
-        run_file(args[1])
+    if args[1:2] == ["batch"]:
+        # Only imported when it's used, it's not needed to run a script
+        from . import batch
+
+        sys.exit(batch.main(args[2:]))
+    if args[1:2] == ["serve"]:
+        from . import server
+
+        sys.exit(server.main(args[2:]))
+    if args[1:2] == ["client"]:
+        from . import client
+
+        sys.exit(client.main(args[2:]))
+    options = _argument_parser().parse_args(args[1:])
+    python_modules = (*DEFAULT_PYTHON_MODULES, *options.allow_python)
+    if options.script is not None:
+        run_file(
+            options.script,
+            python_modules,
+            options.jobs or None,
+            options.profile,
+            options.profile_interval / 1000,
+            options.stats,
+            options.coverage,
+        )
     else:
-        run_repl()
+        run_repl(python_modules)
 
 
 if __name__ == "__main__":
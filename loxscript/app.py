@@ -0,0 +1,52 @@
+import typing as t
+from pathlib import Path
+
+from .handle_errors import ErrorReporter
+from .interpreter.ffi import DEFAULT_PYTHON_MODULES
+from .interpreter.interpreter import Interpreter
+from .interpreter.modules import precompile
+from .interpreter.resolver import Resolver
+from .lexer.scanner import Scanner
+from .parser.parser import Parser
+
+
+class App:
+    def __init__(
+        self,
+        python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES,
+        directory: Path = Path(),
+        jobs: int = 1,
+        path: t.Optional[Path] = None,
+    ):
+        """
+        With more than one job (`None` for one per core) the imported modules are
+        compiled in parallel before the script runs. `path` is the file of the
+        script, if it's run from one.
+        """
+        self.errors = ErrorReporter()
+        self._interpreter = Interpreter(
+            python_modules=python_modules, directory=directory, errors=self.errors
+        )
+        self._interpreter.globals.path = path
+        self._directory = directory
+        self._jobs = jobs
+
+    @property
+    def interpreter(self) -> Interpreter:
+        return self._interpreter
+
+    def __call__(self, source):
+        token_list = Scanner(source, self.errors).get_tokens()
+        statements = Parser(token_list, self.errors).parse()
+        if self.errors.has_any_error():
+            return
+        resolver = Resolver(self._interpreter, self.errors)
+        resolver.resolve(statements)
+        if self.errors.has_any_error():
+            return
+        if self._jobs != 1:
+            self._interpreter.compiled_modules.update(
+                precompile(statements, self._directory, self._jobs)
+            )
+
+        self._interpreter.interpret(statements)
@@ -0,0 +1,196 @@
+"""
+`loxscript batch` runs many independent scripts in a pool of worker processes.
+
+The workers are started once with loxscript already imported, so a job only
+costs running the script and not starting python. Each job gets a fresh
+interpreter, an empty stdin and its own captured stdout and stderr.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import traceback
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from .app import App
+from .handle_errors import exit_status
+from .interpreter.ffi import DEFAULT_PYTHON_MODULES
+
+
+class JobResult(t.NamedTuple):
+    script: str
+    exit_code: int
+    stdout: str
+    stderr: str
+    seconds: float
+
+
+def _prewarm():
+    # Natives are loaded lazily, load the common ones once per worker instead of
+    # in every job
+    import loxscript.interpreter.array_natives  # noqa: F401
+    import loxscript.interpreter.buffer_natives  # noqa: F401
+    import loxscript.interpreter.io_natives  # noqa: F401
+    import loxscript.interpreter.natives  # noqa: F401
+    import loxscript.interpreter.string_natives  # noqa: F401
+
+    sys.stdin = io.StringIO()
+
+
+def run_job(
+    script: str, python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES
+) -> JobResult:
+    """
+    Runs `script` the way `loxscript script` would, but in this process.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            source = Path(script).read_text()
+        except OSError as err:
+            print(f"Could not read '{script}': {err.strerror}.", file=sys.stderr)
+            code = 1
+        else:
+            try:
+                app = App(
+                    python_modules, directory=Path(script).parent, path=Path(script)
+                )
+                app(source)
+                code = app.errors.exit_code()
+            except SystemExit as exit_:
+                code = exit_status(exit_.code)
+            except Exception:
+                # What python would print if the script was run on its own
+                traceback.print_exc()
+                code = 1
+    return JobResult(
+        script,
+        code,
+        stdout.getvalue(),
+        stderr.getvalue(),
+        time.perf_counter() - start,
+    )
+
+
+def run_batch(
+    scripts: t.Sequence[str],
+    workers: t.Optional[int] = None,
+    python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES,
+) -> t.List[JobResult]:
+    """
+    Runs `scripts` across `workers` processes (one per core by default), the
+    results are in the same order as `scripts`.
+    """
+    results: t.List[JobResult] = []
+    python_modules = tuple(python_modules)
+    with ProcessPoolExecutor(workers, initializer=_prewarm) as pool:
+        futures = [pool.submit(run_job, script, python_modules) for script in scripts]
+        for script, future in zip(scripts, futures):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                # The worker died (e.g. the C stack overflowed), the job is lost but
+                # the rest of the batch is still reported
+                results.append(JobResult(script, 1, "", "Worker crashed.\n", 0.0))
+    return results
+
+
+def read_manifest(path: str) -> t.List[str]:
+    """
+    A manifest lists one script per line, relative to the manifest. Empty lines
+    and lines starting with `#` are skipped.
+    """
+    directory = Path(path).parent
+    scripts = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            scripts.append(str(directory / line))
+    return scripts
+
+
+def _argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="loxscript batch",
+        description="Runs many scripts in parallel worker processes.",
+    )
+    parser.add_argument("scripts", nargs="*", help="scripts to run")
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        action="append",
+        default=[],
+        help="file listing scripts to run, one per line",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes, one per core by default",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print the results and the timing summary as JSON",
+    )
+    parser.add_argument(
+        "--allow-python",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="python module scripts may import with `pyimport`",
+    )
+    return parser
+
+
+def _report(results: t.List[JobResult], wall: float):
+    for result in results:
+        print(f"=== {result.script} (exit {result.exit_code}, {result.seconds:.3f}s)")
+        sys.stdout.write(result.stdout)
+        sys.stdout.write(result.stderr)
+    failed = sum(1 for result in results if result.exit_code != 0)
+    total = sum(result.seconds for result in results)
+    print(
+        f"{len(results)} scripts, {failed} failed, "
+        f"{total:.3f}s in scripts, {wall:.3f}s wall time"
+    )
+
+
+def main(args: t.List[str]) -> int:
+    parser = _argument_parser()
+    options = parser.parse_args(args)
+    scripts = list(options.scripts)
+    for manifest in options.manifest:
+        try:
+            scripts.extend(read_manifest(manifest))
+        except OSError as err:
+            parser.error(f"could not read manifest '{manifest}': {err.strerror}")
+    python_modules = (*DEFAULT_PYTHON_MODULES, *options.allow_python)
+
+    start = time.perf_counter()
+    results = run_batch(scripts, options.workers, python_modules)
+    wall = time.perf_counter() - start
+
+    if options.json:
+        json.dump(
+            {
+                "jobs": [result._asdict() for result in results],
+                "wall_seconds": wall,
+                "workers": options.workers or os.cpu_count(),
+            },
+            sys.stdout,
+            indent=2,
+        )
+        print()
+    else:
+        _report(results, wall)
+    return 0 if all(result.exit_code == 0 for result in results) else 1
@@ -0,0 +1,295 @@
+"""
+Benchmarks of the interpreter: runs lox scripts a number of times and reports
+the wall time, the peak memory and the execution counters of every script, and
+compares them with a previous run.
+
+    $ python -m loxscript.bench --output baseline.json
+    $ python -m loxscript.bench --baseline baseline.json --time-threshold 10
+
+Every script is run with each backend:
+
+- `source` scans, parses and resolves the script on every run, like `loxscript
+  script.lox` does.
+- `program` compiles it once and only runs the compiled program, like the
+  embedding API does.
+
+The timed runs come after the warmup runs. The peak memory (from `tracemalloc`)
+and the counters (from `Stats`) are measured in runs of their own, since both slow
+the interpreter down. A script reads its stdin from `<script>.in` if there is one,
+and what it prints is thrown away.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import typing as t
+from pathlib import Path
+
+from .errors import ScriptError
+from .program import compile
+from .stats import Stats
+
+BACKENDS = ("source", "program")
+DEFAULT_SCRIPTS = ("test/benchmark/*.lox", "examples/*.lox")
+
+# A result of a script with a backend, as it's written to the JSON file
+Result = t.Dict[str, t.Any]
+
+
+def _runner(path: Path, backend: str) -> t.Callable[[t.TextIO], None]:
+    source = path.read_text()
+    if backend == "source":
+        return lambda stdout: compile(source, path.parent).run(stdout=stdout)
+    program = compile(source, path.parent)
+    return lambda stdout: program.run(stdout=stdout)
+
+
+def _run(run: t.Callable[[t.TextIO], None], stdin: str):
+    previous = sys.stdin
+    sys.stdin = io.StringIO(stdin)
+    try:
+        with open(os.devnull, "w") as stdout:
+            run(stdout)
+    finally:
+        sys.stdin = previous
+
+
+def measure(
+    path: Path, backend: str, warmup: int = 1, repeat: int = 5, counters: bool = True
+) -> Result:
+    """
+    Runs the script at `path` with `backend`. The result has the `times` of the
+    timed runs in seconds, their `median` and `min`, the `peak_memory` in bytes
+    and the `counters`, or the `error` the script failed with.
+    """
+    result: Result = {"script": path.as_posix(), "backend": backend}
+    stdin_path = path.with_suffix(".in")
+    stdin = stdin_path.read_text() if stdin_path.exists() else ""
+    try:
+        run = _runner(path, backend)
+        for _ in range(warmup):
+            _run(run, stdin)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _run(run, stdin)
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            _run(run, stdin)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stats = Stats()
+        if counters:
+            with stats:
+                _run(run, stdin)
+    except ScriptError as err:
+        result["error"] = str(err)
+        return result
+    except SystemExit as exit_:
+        # The script called `exit`
+        result["error"] = f"Exited with {exit_.code}."
+        return result
+    result.update(
+        times=times,
+        median=statistics.median(times) if times else None,
+        min=min(times, default=None),
+        peak_memory=peak,
+        counters=dict(sorted(stats.counters.items())),
+    )
+    return result
+
+
+def compare(
+    results: t.List[Result],
+    baseline: t.List[Result],
+    time_threshold: float = 10.0,
+    memory_threshold: float = 10.0,
+    counter_threshold: float = 0.0,
+) -> t.List[str]:
+    """
+    The regressions of `results` from `baseline`: median times, peak memory and
+    counters that grew by more than their threshold (in percent). Scripts that
+    aren't in both, or that failed, aren't compared.
+    """
+    previous = {(result["script"], result["backend"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["script"], result["backend"]))
+        if before is None or "error" in result or "error" in before:
+            continue
+        name = f"{result['script']} ({result['backend']})"
+        measures = [
+            ("median time", result["median"], before["median"], time_threshold),
+            (
+                "peak memory",
+                result["peak_memory"],
+                before["peak_memory"],
+                memory_threshold,
+            ),
+        ]
+        measures.extend(
+            (counter, count, before["counters"][counter], counter_threshold)
+            for counter, count in result["counters"].items()
+            if counter in before["counters"]
+        )
+        for measure, now, then, threshold in measures:
+            if now is None or then is None:
+                continue
+            if now > then * (1 + threshold / 100):
+                change = f"{now / then - 1:+.1%}" if then else "new"
+                regressions.append(f"{name}: {measure} {then:g} -> {now:g} ({change})")
+    return regressions
+
+
+_HEADER = f"{'median':>10} {'min':>10} {'memory':>10} {'lox calls':>12}  script"
+
+
+def _line(result: Result) -> str:
+    name = f"{result['script']} ({result['backend']})"
+    if "error" in result:
+        return f"{'failed':>45}  {name}: {result['error']}"
+    median, min_ = result["median"], result["min"]
+    calls = result["counters"].get("lox calls")
+    return (
+        f"{'-' if median is None else f'{median * 1000:.1f}ms':>10} "
+        f"{'-' if min_ is None else f'{min_ * 1000:.1f}ms':>10} "
+        f"{result['peak_memory'] / 1024:>8.0f}KB "
+        f"{'-' if calls is None else f'{calls:,}':>12}  {name}"
+    )
+
+
+def report(results: t.List[Result], file: t.TextIO):
+    print(_HEADER, file=file)
+    for result in results:
+        print(_line(result), file=file)
+
+
+def _scripts(patterns: t.Iterable[str]) -> t.List[Path]:
+    scripts: t.List[Path] = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_file():
+            scripts.append(path)
+        else:
+            scripts.extend(sorted(Path().glob(pattern)))
+    return scripts
+
+
+def _argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m loxscript.bench",
+        description="Runs lox scripts as benchmarks and compares the results with "
+        "a baseline.",
+    )
+    parser.add_argument(
+        "scripts",
+        nargs="*",
+        default=DEFAULT_SCRIPTS,
+        metavar="SCRIPT",
+        help="scripts or glob patterns to run (default: test/benchmark/*.lox "
+        "and examples/*.lox)",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=BACKENDS,
+        help="backend to run the scripts with, could be given more than once "
+        "(default: all)",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="runs before the timed runs"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs")
+    parser.add_argument(
+        "--no-counters",
+        dest="counters",
+        action="store_false",
+        help="don't count the nodes, calls and allocations",
+    )
+    parser.add_argument("--output", metavar="FILE", help="write the results to FILE")
+    parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="results of an earlier run to compare with, exits with 1 if anything "
+        "regressed",
+    )
+    parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=10.0,
+        metavar="PERCENT",
+        help="how much slower the median time could get (default: 10)",
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=10.0,
+        metavar="PERCENT",
+        help="how much the peak memory could grow (default: 10)",
+    )
+    parser.add_argument(
+        "--counter-threshold",
+        type=float,
+        default=0.0,
+        metavar="PERCENT",
+        help="how much the counters could grow (default: 0, they are exact)",
+    )
+    return parser
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> int:
+    options = _argument_parser().parse_args(argv)
+    scripts = _scripts(options.scripts)
+    if not scripts:
+        print("No scripts to run.", file=sys.stderr)
+        return 1
+    results = []
+    # Every result is printed as soon as it's measured, some scripts take long
+    print(_HEADER)
+    for path in scripts:
+        for backend in options.backend or BACKENDS:
+            result = measure(
+                path, backend, options.warmup, options.repeat, options.counters
+            )
+            results.append(result)
+            print(_line(result), flush=True)
+    if options.output is not None:
+        with open(options.output, "w") as out:
+            json.dump(
+                {
+                    "version": 1,
+                    "python": platform.python_version(),
+                    "warmup": options.warmup,
+                    "repeat": options.repeat,
+                    "results": results,
+                },
+                out,
+                indent=2,
+            )
+    if options.baseline is not None:
+        with open(options.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(
+            results,
+            baseline,
+            options.time_threshold,
+            options.memory_threshold,
+            options.counter_threshold,
+        )
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Runs scripts on a `loxscript serve` daemon, so running a script doesn't pay for
+importing the interpreter. Only the standard library is imported here.
+
+The daemon and the client talk in JSON lines over a Unix socket. A request is
+
+    {"script": "/abs/path.lox"} or {"source": "...", "directory": "/abs/dir"}
+
+with an optional "stdin" string and the "cwd" the script runs in, relative paths
+in file natives are relative to it. The daemon answers with any number of
+{"stdout": "..."} and {"stderr": "..."} messages and then {"exit": code}.
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import typing as t
+from pathlib import Path
+
+
+def default_socket_path() -> str:
+    if "LOXSCRIPT_SOCKET" in os.environ:
+        return os.environ["LOXSCRIPT_SOCKET"]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        # Only the user can access it
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "loxscript.sock")
+    # Anyone could create files in the temporary directory, the socket is put in a
+    # directory the server creates that only the user can access
+    directory = os.path.join(tempfile.gettempdir(), f"loxscript-{os.getuid()}")
+    return os.path.join(directory, "loxscript.sock")
+
+
+def check_owner(path: str):
+    """
+    Raises `OSError` unless `path` belongs to the current user, so scripts are
+    never sent to (and output never taken from) a socket someone else created.
+    """
+    if os.stat(path).st_uid != os.getuid():
+        raise OSError(f"'{path}' belongs to another user.")
+
+
+def send(
+    request: t.Dict[str, t.Any],
+    socket_path: t.Optional[str] = None,
+    stdout: t.Optional[t.TextIO] = None,
+    stderr: t.Optional[t.TextIO] = None,
+) -> int:
+    """
+    Sends `request` to the daemon, writes the output as it arrives and returns the
+    exit code. Raises `OSError` if the daemon can't be reached.
+    """
+    stdout = sys.stdout if stdout is None else stdout
+    stderr = sys.stderr if stderr is None else stderr
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        socket_path = socket_path or default_socket_path()
+        check_owner(socket_path)
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode() + b"\n")
+        connection.shutdown(socket.SHUT_WR)
+        with connection.makefile("r", encoding="utf-8") as messages:
+            for line in messages:
+                message = json.loads(line)
+                if "stdout" in message:
+                    stdout.write(message["stdout"])
+                elif "stderr" in message:
+                    stderr.write(message["stderr"])
+                elif "exit" in message:
+                    return message["exit"]
+    # Not an `OSError`, the script might have run already so it must not be run
+    # again without the daemon
+    stderr.write("The loxscript server closed the connection.\n")
+    return 1
+
+
+def _argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="loxscript client",
+        description="Runs a script on a running `loxscript serve` daemon.",
+    )
+    parser.add_argument("script", help="script to run")
+    parser.add_argument("--socket", help="socket of the daemon")
+    parser.add_argument(
+        "--stdin", action="store_true", help="send the stdin to the script"
+    )
+    parser.add_argument(
+        "--no-fallback",
+        action="store_true",
+        help="fail instead of running the script here if there is no daemon",
+    )
+    return parser
+
+
+def main(args: t.Optional[t.List[str]] = None) -> int:
+    options = _argument_parser().parse_args(sys.argv[1:] if args is None else args)
+    request = {"script": str(Path(options.script).resolve()), "cwd": os.getcwd()}
+    if options.stdin:
+        request["stdin"] = sys.stdin.read()
+    try:
+        return send(request, options.socket)
+    except OSError as err:
+        if options.no_fallback:
+            print(f"Could not reach the loxscript server: {err}", file=sys.stderr)
+            return 1
+    # Without a daemon the script still runs, just without the quick start
+    from .__main__ import run_file
+
+    if options.stdin:
+        sys.stdin = io.StringIO(request["stdin"])
+    run_file(options.script)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""
+Statement and branch coverage of lox scripts.
+
+Every statement of a script and of the modules it imports, and both outcomes of
+every `if`, `while`, `and` and `or`, get an index when they are compiled. While
+the script runs the interpreter only sets `hits[index]`, so there is no
+bookkeeping per statement beyond that.
+
+    coverage = Coverage()
+    coverage.install(app.interpreter)
+    app(source)
+    coverage.save("loxcoverage")
+"""
+
+import json
+import os
+import typing as t
+from pathlib import Path
+
+from .interpreter.interpreter import _GENERATED, Interpreter, statement_line
+from .lexer.token_type import TokenType as tt
+from .parser import expr as e
+from .parser import stmt
+
+# The methods `install` replaces on the interpreter
+_INSTALLED = (
+    "_execute",
+    "_generate",
+    "visit_if_statement",
+    "visit_while_statement",
+    "visit_logical",
+    "interpret",
+    "_compile",
+)
+
+
+class Point(t.NamedTuple):
+    """
+    Something that is covered: a statement, or one outcome of a branch, e.g. "if
+    true" or "or short-circuited".
+    """
+
+    file: str
+    line: int
+    kind: str
+
+
+class Coverage:
+    def __init__(self):
+        # `hits[i]` is set when `points[i]` runs
+        self.hits = bytearray()
+        self.points: t.List[Point] = []
+        # Indexes of the statements, and of the first outcome of the branches, the
+        # second outcome is the next index
+        self._statements: t.Dict[t.Any, int] = {}
+        self._branches: t.Dict[t.Any, int] = {}
+
+    def _point(self, file: str, line: int, kind: str) -> int:
+        self.points.append(Point(file, line, kind))
+        self.hits.append(0)
+        return len(self.points) - 1
+
+    def add(self, statements: t.Iterable[t.Any], file: str):
+        """
+        Gives an index to the statements and branches in `statements`, which are
+        from `file`.
+        """
+        pending: t.List[t.Any] = list(statements)
+        while pending:
+            node = pending.pop()
+            if isinstance(node, (list, tuple)):
+                pending.extend(node)
+                continue
+            if not isinstance(node, (stmt.Stmt, e.Expr)) or node in self._statements:
+                continue
+            if isinstance(node, stmt.Block):
+                # The increment of a `for` loop is an expression in a block
+                for element in node.statements:
+                    if isinstance(element, e.Expr):
+                        self._statements[element] = self._point(
+                            file, statement_line(element), "statement"
+                        )
+            if isinstance(node, stmt.Stmt):
+                line = statement_line(node)
+                self._statements[node] = self._point(file, line, "statement")
+                if isinstance(node, (stmt.If, stmt.While)):
+                    kind = "if" if isinstance(node, stmt.If) else "while"
+                    self._branches[node] = self._point(file, line, f"{kind} true")
+                    self._point(file, line, f"{kind} false")
+            elif isinstance(node, e.Logical):
+                line, kind = node.operator.line, node.operator.lexeme
+                self._branches[node] = self._point(
+                    file, line, f"{kind} short-circuited"
+                )
+                self._point(file, line, f"{kind} evaluated the right side")
+            pending.extend(vars(node).values())
+
+    def install(self, interpreter: Interpreter):
+        """
+        Collects the coverage of what `interpreter` runs from now on. It replaces
+        the methods of the interpreter that `settrace` uses, so the two can't be
+        used at the same time.
+        """
+        statements, branches, hits = self._statements, self._branches, self.hits
+        evaluate, is_truthy = interpreter._evaluate, interpreter._is_truthy
+
+        def execute(st: stmt.Stmt):
+            hits[statements[st]] = 1
+            st.accept(interpreter)
+
+        def visit_if_statement(if_stmt: stmt.If):
+            branch = branches[if_stmt]
+            if is_truthy(evaluate(if_stmt.condition)):
+                hits[branch] = 1
+                interpreter._execute(if_stmt.then_branch)
+            else:
+                hits[branch + 1] = 1
+                if if_stmt.else_branch is not None:
+                    interpreter._execute(if_stmt.else_branch)
+
+        def visit_while_statement(while_stmt: stmt.While):
+            branch = branches[while_stmt]
+            while is_truthy(evaluate(while_stmt.condition)):
+                hits[branch] = 1
+                interpreter._execute(while_stmt.block)
+            hits[branch + 1] = 1
+
+        def visit_logical(logical: e.Logical):
+            left = evaluate(logical.left)
+            branch = branches[logical]
+            # `or` stops at a truthy value, `and` at a falsy one
+            if (logical.operator.type == tt.OR) == is_truthy(left):
+                hits[branch] = 1
+                return left
+            hits[branch + 1] = 1
+            return evaluate(logical.right)
+
+        def generate(st: stmt.Stmt) -> t.Iterator[t.Any]:
+            # The statements `_generate` runs itself, the rest go through `execute`
+            if isinstance(st, _GENERATED):
+                hits[statements[st]] = 1
+            if isinstance(st, stmt.If):
+                return generate_if(st)
+            if isinstance(st, stmt.While):
+                return generate_while(st)
+            return Interpreter._generate(interpreter, st)
+
+        def generate_if(if_stmt: stmt.If) -> t.Iterator[t.Any]:
+            branch = branches[if_stmt]
+            if is_truthy(evaluate(if_stmt.condition)):
+                hits[branch] = 1
+                yield from interpreter._generate(if_stmt.then_branch)
+            else:
+                hits[branch + 1] = 1
+                if if_stmt.else_branch is not None:
+                    yield from interpreter._generate(if_stmt.else_branch)
+
+        def generate_while(while_stmt: stmt.While) -> t.Iterator[t.Any]:
+            branch = branches[while_stmt]
+            while is_truthy(evaluate(while_stmt.condition)):
+                hits[branch] = 1
+                yield from interpreter._generate(while_stmt.block)
+            hits[branch + 1] = 1
+
+        def interpret(statements: t.List[stmt.Stmt]):
+            path = interpreter.globals.path
+            self.add(statements, "<script>" if path is None else str(path.resolve()))
+            Interpreter.interpret(interpreter, statements)
+
+        def compile_(path: Path):
+            compiled = Interpreter._compile(interpreter, path)
+            if compiled is not None:
+                self.add(compiled[0], str(path.resolve()))
+            return compiled
+
+        methods = (
+            execute,
+            generate,
+            visit_if_statement,
+            visit_while_statement,
+            visit_logical,
+            interpret,
+            compile_,
+        )
+        for name, method in zip(_INSTALLED, methods):
+            setattr(interpreter, name, method)
+
+    @staticmethod
+    def uninstall(interpreter: Interpreter):
+        for name in _INSTALLED:
+            interpreter.__dict__.pop(name, None)
+
+    def files(self) -> t.Dict[str, t.Dict[str, t.Any]]:
+        """
+        For every file, the lines that ran, the lines with statements that never
+        ran, and `[line, outcome, 0 or 1]` for every branch outcome.
+        """
+        files: t.Dict[str, t.Dict[str, t.Any]] = {}
+        for point, hit in zip(self.points, self.hits):
+            data = files.setdefault(
+                point.file, {"executed": set(), "missed": set(), "branches": []}
+            )
+            if point.kind == "statement":
+                data["executed" if hit else "missed"].add(point.line)
+            else:
+                data["branches"].append([point.line, point.kind, hit])
+        for data in files.values():
+            # A line with a statement that ran isn't missed
+            data["missed"] -= data["executed"]
+            data["executed"] = sorted(data["executed"])
+            data["missed"] = sorted(data["missed"])
+            data["branches"].sort()
+        return files
+
+    def save(self, directory: str) -> t.Dict[str, t.Dict[str, t.Any]]:
+        """
+        Writes `coverage.json` and an annotated copy of every file into
+        `directory`, and returns what's in `coverage.json`. The copies are
+        `<file>.cover`, in the same directories relative to each other as the
+        files, so files with the same name don't overwrite each other.
+        """
+        os.makedirs(directory, exist_ok=True)
+        files = self.files()
+        with open(os.path.join(directory, "coverage.json"), "w") as out:
+            json.dump({"version": 1, "files": files}, out, separators=(",", ":"))
+        paths = [Path(file) for file in files if file != "<script>"]
+        if not paths:
+            return files
+        root = Path(os.path.commonpath([path.parent for path in paths]))
+        for path in paths:
+            cover = Path(directory, path.relative_to(root)).with_name(
+                path.name + ".cover"
+            )
+            cover.parent.mkdir(parents=True, exist_ok=True)
+            cover.write_text(annotate(str(path), files[str(path)]), encoding="utf-8")
+        return files
+
+    def report(self, file: t.TextIO):
+        """
+        Writes the lines and the branch outcomes that ran in every file.
+        """
+        print(f"{'lines':>13} {'branches':>13}  file", file=file)
+        for name, data in sorted(self.files().items()):
+            executed, missed = len(data["executed"]), len(data["missed"])
+            taken = sum(hit for _, _, hit in data["branches"])
+            branches = len(data["branches"])
+            print(
+                f"{_fraction(executed, executed + missed):>13} "
+                f"{_fraction(taken, branches):>13}  {name}",
+                file=file,
+            )
+
+
+def _fraction(part: int, whole: int) -> str:
+    percent = f"{part / whole:.0%}" if whole else "-"
+    return f"{part}/{whole} {percent:>4}"
+
+
+def annotate(file: str, data: t.Dict[str, t.Any]) -> str:
+    """
+    The source of `file` with a mark on every line with statements: `+` if it ran,
+    `-` if it didn't, and `~` if it ran but some branch outcome on it never
+    happened. The outcomes that never happened are listed under the line.
+    """
+    executed, missed = set(data["executed"]), set(data["missed"])
+    not_taken: t.Dict[int, t.List[str]] = {}
+    for line, kind, hit in data["branches"]:
+        if not hit:
+            not_taken.setdefault(line, []).append(kind)
+    try:
+        source = Path(file).read_text(encoding="utf-8").splitlines()
+    except (OSError, UnicodeDecodeError):
+        return ""
+    lines = []
+    for number, text in enumerate(source, 1):
+        if number in missed:
+            mark = "-"
+        elif number in not_taken and number in executed:
+            mark = "~"
+        elif number in executed:
+            mark = "+"
+        else:
+            mark = " "
+        lines.append(f"{mark} {number:>5} | {text}")
+        if number in executed:
+            for kind in not_taken.get(number, ()):
+                lines.append(f"{'':>9}^ never: {kind}")
+    return "\n".join(lines) + "\n"
@@ -16,3 +16,21 @@ class Return(RuntimeError):
     def __init__(self, value):
         super(Return, self).__init__()
         self.value = value
+
+
+class ScriptError(Exception):
+    """
+    Raised by the embedding API when a script has errors, `diagnostics` are the
+    reported errors.
+    """
+
+    def __init__(self, diagnostics):
+        super(ScriptError, self).__init__("\n".join(map(str, diagnostics)))
+        self.diagnostics = diagnostics
+
+    @property
+    def exit_code(self) -> int:
+        # What running the script on its own would exit with
+        if any(diagnostic.runtime for diagnostic in self.diagnostics):
+            return 70
+        return 65
@@ -1,47 +1,102 @@
 import sys
+import typing as t
 
 from .errors import RuntimeException
 from .lexer.token import Token
 from .lexer.token_type import TokenType as tt
 
-_errors = {"_errors": False, "runtime_errors": False}
 
-
-def report(line: int, where: str, message: str):
-    sys.stderr.write(f"[line {line}] Error{where}: {message}\n")
-    _errors["_errors"] = True
-
-
-def update_error(runtime: bool, other_error: bool):
-    _errors["_errors"] = other_error
-    _errors["runtime_errors"] = runtime
-
-
-def error(line: int, error_message: str):
-    report(line, "", error_message)
-
-
-def parse_error(token: Token, message: str):
-    if token.type == tt.EOF:
-        report(token.line, " at end", message)
-    else:
-        report(token.line, f" at '{token.lexeme}'", message)
-
-
-def runtime_error(runtime_exception: RuntimeException):
-    sys.stderr.write(
-        str(runtime_exception) + f"\n[line {runtime_exception.token.line}]\n"
-    )
-    _errors["runtime_errors"] = True
-
-
-def has_error():
-    return _errors["_errors"]
-
-
-def has_runtime_error():
-    return _errors["runtime_errors"]
-
-
-def has_any_error():
-    return any(_errors.values())
+class Diagnostic(t.NamedTuple):
+    """
+    A reported error. `where` is like " at 'x'", it's empty if the error isn't at a
+    particular token.
+    """
+
+    line: int
+    message: str
+    where: str = ""
+    runtime: bool = False
+
+    def __str__(self):
+        if self.runtime:
+            return f"{self.message}\n[line {self.line}]"
+        return f"[line {self.line}] Error{self.where}: {self.message}"
+
+
+class ErrorReporter:
+    """
+    Collects the errors of one interpreter, so interpreters in the same process (or
+    in different threads) don't mix up each other's errors.
+
+    With `echo` the errors are also written to `sys.stderr` as they are reported.
+    """
+
+    def __init__(self, echo: bool = True):
+        self.echo = echo
+        self.diagnostics: t.List[Diagnostic] = []
+        self._error = False
+        self._runtime_error = False
+
+    def _add(self, diagnostic: Diagnostic):
+        self.diagnostics.append(diagnostic)
+        if self.echo:
+            sys.stderr.write(f"{diagnostic}\n")
+
+    def report(self, line: int, where: str, message: str):
+        self._add(Diagnostic(line, message, where))
+        self._error = True
+
+    def error(self, line: int, error_message: str):
+        self.report(line, "", error_message)
+
+    def parse_error(self, token: Token, message: str):
+        if token.type == tt.EOF:
+            self.report(token.line, " at end", message)
+        else:
+            self.report(token.line, f" at '{token.lexeme}'", message)
+
+    def runtime_error(self, runtime_exception: RuntimeException):
+        self._add(
+            Diagnostic(
+                runtime_exception.token.line, str(runtime_exception), runtime=True
+            )
+        )
+        self._runtime_error = True
+
+    def reset(self):
+        """
+        Forgets the errors, e.g. before the next line of the REPL.
+        """
+        self.diagnostics.clear()
+        self._error = False
+        self._runtime_error = False
+
+    def has_error(self) -> bool:
+        return self._error
+
+    def has_runtime_error(self) -> bool:
+        return self._runtime_error
+
+    def has_any_error(self) -> bool:
+        return self._error or self._runtime_error
+
+    def exit_code(self) -> int:
+        # Same codes as jlox, 70 is EX_SOFTWARE and 65 is EX_DATAERR from sysexits.h
+        if self._runtime_error:
+            return 70
+        if self._error:
+            return 65
+        return 0
+
+
+def exit_status(code: t.Any) -> int:
+    """
+    The exit code for a `SystemExit` with `code`, the same conversion python does
+    when it exits.
+    """
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
@@ -0,0 +1,136 @@
+"""
+Numeric arrays and the natives that compute over arrays and lists of numbers.
+"""
+
+import typing as t
+from array import array
+
+from ..errors import RuntimeException
+from .callable import Callable
+from .lox_array import LoxArray
+from .lox_list import LoxList
+
+
+def _numbers(value: t.Any, name: str) -> t.Union[LoxArray, t.List[float]]:
+    """
+    Array or list of numbers the numeric natives work on.
+    """
+    if isinstance(value, LoxArray):
+        return value
+    if isinstance(value, LoxList) and all(
+        isinstance(element, float) for element in value.elements
+    ):
+        return value.elements
+    raise RuntimeException(
+        None, f"Argument to '{name}' must be an array or a list of numbers."
+    )
+
+
+def _array(value: t.Any, name: str) -> LoxArray:
+    if not isinstance(value, LoxArray):
+        raise RuntimeException(None, f"Argument to '{name}' must be an array.")
+    return value
+
+
+class Array(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # `array(3)` gives three zeros, `array([1, 2])` copies the numbers
+        value = arguments[0]
+        if isinstance(value, float):
+            if not value.is_integer() or value < 0:
+                raise RuntimeException(
+                    None, "Array size must be a non-negative integer."
+                )
+            try:
+                return LoxArray.zeros(int(value))
+            except (MemoryError, OverflowError):
+                raise RuntimeException(None, "Array size is too large.")
+        if isinstance(value, LoxList):
+            return LoxArray(array("d", _numbers(value, "array")))
+        raise RuntimeException(None, "Argument must be a size or a list of numbers.")
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Sum(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        numbers = _numbers(arguments[0], "sum")
+        if isinstance(numbers, LoxArray):
+            return numbers.total()
+        return float(sum(numbers))
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Min(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        numbers = _numbers(arguments[0], "min")
+        if not len(numbers):
+            raise RuntimeException(None, "Cannot take the minimum of nothing.")
+        if isinstance(numbers, LoxArray):
+            return numbers.minimum()
+        return min(numbers)
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Max(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        numbers = _numbers(arguments[0], "max")
+        if not len(numbers):
+            raise RuntimeException(None, "Cannot take the maximum of nothing.")
+        if isinstance(numbers, LoxArray):
+            return numbers.maximum()
+        return max(numbers)
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class MapAdd(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # Returns a new array, the operand is a number or an array of the same length
+        values = _array(arguments[0], "map_add")
+        operand = arguments[1]
+        if isinstance(operand, LoxArray):
+            if len(operand) != len(values):
+                raise RuntimeException(None, "Arrays must have the same length.")
+        elif not isinstance(operand, float):
+            raise RuntimeException(None, "Operand must be a number or an array.")
+        return values.add(operand)
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Scale(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        values = _array(arguments[0], "scale")
+        if not isinstance(arguments[1], float):
+            raise RuntimeException(None, "Operand must be a number.")
+        return values.scale(arguments[1])
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Dot(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        left = _array(arguments[0], "dot")
+        right = _array(arguments[1], "dot")
+        if len(left) != len(right):
+            raise RuntimeException(None, "Arrays must have the same length.")
+        return left.dot(right)
+
+    @property
+    def arity(self) -> int:
+        return 2
@@ -0,0 +1,119 @@
+"""
+Natives that return awaitables instead of blocking, so while one coroutine waits
+the event loop runs the others. They are only imported when a script uses one of
+them, scripts that never wait for anything don't import asyncio.
+"""
+
+import asyncio
+import typing as t
+from collections.abc import Awaitable
+
+from ..errors import RuntimeException
+from .callable import Callable
+from .lox_list import LoxList
+from .io_natives import ReadFile, _os_error, _path
+
+
+class NativeAwaitable:
+    """
+    What the natives return. The python coroutine is only created when it's first
+    awaited, one that is never awaited (`sleep(1);`) is just dropped, without the
+    warning python gives for a coroutine that never ran. Like a lox coroutine it
+    runs once, awaiting it again gives the same result.
+    """
+
+    def __init__(self, name: str, start: t.Callable[[], t.Awaitable[t.Any]]):
+        self._name = name
+        self._start = start
+        self._task: t.Optional["asyncio.Future[t.Any]"] = None
+
+    def __await__(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._start())
+        return self._task.__await__()
+
+    def __str__(self):
+        return f"<awaitable {self._name}>"
+
+
+class Sleep(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        seconds = arguments[0]
+        if not isinstance(seconds, float) or seconds < 0:
+            raise RuntimeException(None, "Seconds must be a non-negative number.")
+        return NativeAwaitable("sleep", lambda: asyncio.sleep(seconds))
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class ReadFileAsync(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        path = _path(arguments[0])
+        return NativeAwaitable("readFileAsync", lambda: _read_file(interpreter, path))
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+async def _read_file(interpreter, path: str) -> str:
+    # There is no non-blocking file I/O in asyncio, the file is read in a thread
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, ReadFile().call, interpreter, [path])
+
+
+class UnixRequest(Callable):
+    """
+    Sends a string to a Unix socket and returns everything that is sent back until
+    the other side closes the connection.
+    """
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        path, data = _path(arguments[0]), arguments[1]
+        if not isinstance(data, str):
+            raise RuntimeException(None, "Data must be a string.")
+        return NativeAwaitable("unixRequest", lambda: _unix_request(path, data))
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+async def _unix_request(path: str, data: str) -> str:
+    try:
+        reader, writer = await asyncio.open_unix_connection(path)
+        try:
+            writer.write(data.encode())
+            await writer.drain()
+            writer.write_eof()
+            response = await reader.read()
+        finally:
+            writer.close()
+    except OSError as err:
+        raise _os_error(path, err)
+    return response.decode("utf-8", errors="replace")
+
+
+class Gather(Callable):
+    """
+    Waits for a list of awaitables at the same time, the results are returned in
+    a list in the same order.
+    """
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        awaitables = arguments[0]
+        if not isinstance(awaitables, LoxList) or not all(
+            isinstance(awaitable, Awaitable) for awaitable in awaitables
+        ):
+            raise RuntimeException(None, "Argument must be a list of awaitables.")
+        return NativeAwaitable("gather", lambda: _gather(list(awaitables)))
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+async def _gather(awaitables: t.List[t.Awaitable[t.Any]]) -> LoxList:
+    return LoxList(list(await asyncio.gather(*awaitables)))
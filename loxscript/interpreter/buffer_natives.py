@@ -0,0 +1,96 @@
+"""
+Natives that create buffers and read and write the numbers in them.
+"""
+
+import typing as t
+
+from ..errors import RuntimeException
+from .callable import Callable
+from .lox_buffer import LoxBuffer
+
+
+def _buffer(value: t.Any) -> LoxBuffer:
+    if not isinstance(value, LoxBuffer):
+        raise RuntimeException(None, "Argument must be a buffer.")
+    return value
+
+
+class Buffer(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # `buffer(4)` gives four zero bytes, `buffer("text")` the UTF-8 encoding
+        value = arguments[0]
+        if isinstance(value, float):
+            if not value.is_integer() or value < 0:
+                raise RuntimeException(
+                    None, "Buffer size must be a non-negative integer."
+                )
+            try:
+                return LoxBuffer.zeros(int(value))
+            except (MemoryError, OverflowError):
+                raise RuntimeException(None, "Buffer size is too large.")
+        if isinstance(value, str):
+            return LoxBuffer(bytearray(value, "utf-8"))
+        raise RuntimeException(None, "Argument must be a size or a string.")
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class ReadInt(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        buffer, offset, size = arguments
+        return _buffer(buffer).read(offset, size, "int")
+
+    @property
+    def arity(self) -> int:
+        return 3
+
+
+class ReadUint(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        buffer, offset, size = arguments
+        return _buffer(buffer).read(offset, size, "uint")
+
+    @property
+    def arity(self) -> int:
+        return 3
+
+
+class ReadFloat(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        buffer, offset, size = arguments
+        return _buffer(buffer).read(offset, size, "float")
+
+    @property
+    def arity(self) -> int:
+        return 3
+
+
+class WriteInt(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        buffer, offset, size, value = arguments
+        _buffer(buffer).write(offset, size, "int", value)
+
+    @property
+    def arity(self) -> int:
+        return 4
+
+
+class WriteFloat(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        buffer, offset, size, value = arguments
+        _buffer(buffer).write(offset, size, "float", value)
+
+    @property
+    def arity(self) -> int:
+        return 4
+
+
+class Decode(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        return _buffer(arguments[0]).decode()
+
+    @property
+    def arity(self) -> int:
+        return 1
@@ -4,6 +4,8 @@ from abc import ABC, abstractmethod
 from ..errors import Return
 from ..parser import stmt
 from .environment import Environment
+from .lox_coroutine import LoxCoroutine
+from .lox_generator import LoxGenerator
 
 
 class Callable(ABC):
@@ -21,12 +23,17 @@ class Callable(ABC):
 
 
 class Function(Callable):
-    def __init__(self, declaration: stmt.Function, closure: Environment):
+    def __init__(
+        self, declaration: stmt.Function, closure: Environment, globals_: Environment
+    ):
         self._declaration = declaration
         # This environment is of when the function was declared not when it is called
         # which is what we want in this case, as it represents the lexical surroundings
         # of the function declaration.
         self._closure = closure
+        # Globals of the module the function was declared in, a function imported
+        # from another module still sees the globals of its own module.
+        self._globals = globals_
 
     def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
         # This would allow us to have variables scoped in the enclosing environment
@@ -37,14 +44,47 @@ class Function(Callable):
         # function declaration
         for arg_name, arg_value in zip(self._declaration.params, arguments):
             environment.define(arg_name.lexeme, arg_value)
+        if self._declaration.is_generator:
+            # The body only runs as the generator is iterated
+            return LoxGenerator(
+                interpreter, self._declaration, environment, self._globals
+            )
+        if self._declaration.is_async:
+            # The body only runs once the coroutine is awaited
+            return LoxCoroutine(
+                interpreter, self._declaration, environment, self._globals
+            )
+        previous_globals = interpreter.globals
+        interpreter.globals = self._globals
         try:
             interpreter.execute_block(self._declaration.body, environment=environment)
         except Return as e:
             return e.value
+        finally:
+            interpreter.globals = previous_globals
 
     def __repr__(self):
         return f"<fn {self._declaration.name.lexeme}>"
 
+    @property
+    def name(self) -> str:
+        return self._declaration.name.lexeme
+
+    @property
+    def line(self) -> int:
+        # Where the function is declared
+        return self._declaration.name.line
+
+    @property
+    def globals(self) -> Environment:
+        return self._globals
+
+    @property
+    def is_top_level(self) -> bool:
+        # Functions declared in a block or bound to an instance also close over
+        # something other than the globals of their module
+        return self._closure is self._globals
+
     @property
     def arity(self) -> int:
         return len(self._declaration.params)
@@ -56,4 +96,4 @@ class Function(Callable):
         environment.define("this", instance)
         # `this` keyword is treated like a variable in enclosing environment that points
         # to `ClassInstance` instance
-        return Function(self._declaration, environment)
+        return Function(self._declaration, environment, self._globals)
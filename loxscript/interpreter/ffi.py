@@ -0,0 +1,175 @@
+import importlib
+import sys
+import types
+import typing as t
+from array import array
+from collections.abc import Iterator
+
+from ..errors import RuntimeException
+from ..lexer.token import Token
+from .callable import Callable
+from .lox_array import LoxArray
+from .lox_buffer import LoxBuffer
+from .lox_list import LoxList
+from .lox_map import LoxMap
+
+# Modules scripts can import without being allowed explicitly. They can't reach
+# the file system, the network or other processes.
+DEFAULT_PYTHON_MODULES = ("math", "cmath", "statistics")
+
+
+class PythonObject:
+    """
+    Python object handed to lox. Its public attributes can be read with `.`
+    """
+
+    def __init__(self, bridge: "PythonBridge", value: t.Any):
+        self._bridge = bridge
+        self.value = value
+
+    def get(self, name: Token) -> t.Any:
+        if name.lexeme.startswith("_"):
+            raise RuntimeException(name, "Cannot access private python attributes")
+        try:
+            attribute = getattr(self.value, name.lexeme)
+        except AttributeError:
+            raise RuntimeException(name, f"Undefined property {name.lexeme}")
+        return self._bridge.to_lox(attribute, name)
+
+    def __str__(self):
+        if isinstance(self.value, types.ModuleType):
+            return f"<python module {self.value.__name__}>"
+        return f"<python {self.value!r}>"
+
+
+class PythonCallable(PythonObject, Callable):
+    @property
+    def arity(self) -> t.Optional[int]:
+        # Python checks the arguments itself
+        return None
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        bridge = self._bridge
+        try:
+            result = self.value(*(bridge.to_python(a) for a in arguments))
+        except RuntimeException:
+            # From a lox function the python code called back into
+            raise
+        except Exception as err:
+            raise RuntimeException(None, f"Python {type(err).__name__}: {err}")
+        return bridge.to_lox(result)
+
+
+class PythonIterator(PythonObject):
+    def __iter__(self) -> t.Iterator[t.Any]:
+        return (self._bridge.to_lox(value) for value in self.value)
+
+
+class PythonBridge:
+    """
+    Imports allowed python modules for an interpreter and converts values between
+    python and lox.
+
+    Numbers, strings, booleans and `nil` are converted directly, lists and maps
+    are copied, arrays and buffers are passed as the `array` and `memoryview` they
+    are built on without copying and lox functions become python callables.
+    Anything else is wrapped in a `PythonObject`.
+    """
+
+    def __init__(self, interpreter, allowed_modules: t.Iterable[str]):
+        self._interpreter = interpreter
+        self._allowed = set(allowed_modules)
+
+    @property
+    def allowed_modules(self) -> t.Tuple[str, ...]:
+        return tuple(sorted(self._allowed))
+
+    def _is_allowed(self, name: str) -> bool:
+        # Allowing a module also allows its submodules
+        parts = name.split(".")
+        return any(
+            ".".join(parts[:i]) in self._allowed for i in range(1, len(parts) + 1)
+        )
+
+    def import_(self, name: str) -> t.Any:
+        """
+        Imports a module, or a single attribute of one with `module.attribute`
+        """
+        if not self._is_allowed(name):
+            raise RuntimeException(None, f"Python module '{name}' is not allowed.")
+        try:
+            return self.to_lox(importlib.import_module(name))
+        except ImportError:
+            module_name, _, attribute = name.rpartition(".")
+            try:
+                module = importlib.import_module(module_name)
+                return self.to_lox(getattr(module, attribute))
+            except (ImportError, AttributeError, ValueError):
+                raise RuntimeException(None, f"Cannot import python module '{name}'.")
+
+    def to_python(self, value: t.Any) -> t.Any:
+        if isinstance(value, float):
+            # Python APIs that take integers don't accept floats
+            return int(value) if value.is_integer() else value
+        if isinstance(value, PythonObject):
+            return value.value
+        if isinstance(value, LoxArray):
+            return value.data
+        if isinstance(value, LoxBuffer):
+            return value.view
+        if isinstance(value, LoxList):
+            return [self.to_python(element) for element in value.elements]
+        if isinstance(value, LoxMap):
+            return {self.to_python(k): self.to_python(v) for k, v in value.items()}
+        if isinstance(value, Callable):
+            return self._callback(value)
+        return value
+
+    def to_lox(self, value: t.Any, token: t.Optional[Token] = None) -> t.Any:
+        if value is None or isinstance(value, (bool, str)):
+            return value
+        if isinstance(value, (int, float)):
+            return float(value)
+        if type(value).__module__.startswith("loxscript."):
+            # A lox value that went through python code
+            return value
+        if isinstance(value, (list, tuple)):
+            return LoxList([self.to_lox(element) for element in value])
+        if isinstance(value, dict):
+            map_ = LoxMap()
+            for key, element in value.items():
+                map_.set_item(token, self.to_lox(key), self.to_lox(element))
+            return map_
+        if isinstance(value, array):
+            return LoxArray(value if value.typecode == "d" else array("d", value))
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return LoxBuffer(value)
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and isinstance(value, numpy.ndarray) and value.ndim == 1:
+            return LoxArray(array("d", value.astype(numpy.float64).tobytes()))
+        if numpy is not None and isinstance(value, numpy.generic):
+            return self.to_lox(value.item())
+        if isinstance(value, types.ModuleType):
+            if not self._is_allowed(value.__name__):
+                raise RuntimeException(
+                    token, f"Python module '{value.__name__}' is not allowed."
+                )
+            return PythonObject(self, value)
+        if callable(value):
+            return PythonCallable(self, value)
+        if isinstance(value, Iterator):
+            return PythonIterator(self, value)
+        return PythonObject(self, value)
+
+    def _callback(self, function: Callable) -> t.Callable[..., t.Any]:
+        interpreter = self._interpreter
+
+        def call(*args: t.Any) -> t.Any:
+            arguments = [self.to_lox(arg) for arg in args]
+            if function.arity is not None and function.arity != len(arguments):
+                raise TypeError(
+                    f"Expected {function.arity} arguments but got {len(arguments)}"
+                )
+            return self.to_python(function.call(interpreter, arguments))
+
+        return call
@@ -0,0 +1,19 @@
+import typing as t
+from abc import ABC, abstractmethod
+
+from ..lexer.token import Token
+
+
+class Indexable(ABC):
+    """
+    Values that support `value[index]` and `value[index] = other`.
+    The token is the closing `]`, it is used to report errors on the right line.
+    """
+
+    @abstractmethod
+    def get_item(self, token: Token, index: t.Any) -> t.Any:
+        pass
+
+    @abstractmethod
+    def set_item(self, token: Token, index: t.Any, value: t.Any) -> None:
+        pass
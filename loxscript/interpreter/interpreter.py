@@ -1,17 +1,65 @@
 import operator
 import typing as t
+from collections.abc import Awaitable, Iterable
 from contextlib import ExitStack, contextmanager
+from pathlib import Path
 
 from ..errors import Return, RuntimeException
-from ..handle_errors import runtime_error
+from ..handle_errors import ErrorReporter
 from ..lexer.token import Token
 from ..lexer.token_type import TokenType as tt
 from ..parser import expr as e
 from ..parser import stmt
 from .callable import Callable, Function
 from .environment import Environment
+from .ffi import DEFAULT_PYTHON_MODULES, PythonBridge, PythonObject
+from .indexable import Indexable
+from .lox_array import LoxArray
 from .lox_class import Class, ClassInstance
-from .natives import Chr, Clock, Exit, GetChar, PrintError
+from .lox_coroutine import LoxCoroutine
+from .lox_file import TextReader
+from .lox_generator import LoxGenerator
+from .lox_list import LoxList, to_index
+from .lox_map import LoxMap
+from .modules import Compiled, LoxModule, compile_module, module_path
+from .registry import GlobalEnvironment, NativeRegistry
+
+if t.TYPE_CHECKING:
+    import asyncio
+
+# Called as `hook(event, line, arg)`, see `Interpreter.settrace`
+Hook = t.Callable[[str, int, t.Any], None]
+
+# Statements that `_generate` runs itself instead of passing them to `_execute`
+_GENERATED = (stmt.Yield, stmt.Await, stmt.Block, stmt.If, stmt.While, stmt.ForIn)
+
+# The methods `settrace` replaces on the interpreter, by their traced versions
+_TRACED = {
+    "_execute": "_traced_execute",
+    "_generate": "_traced_generate",
+    "visit_call_expr": "_traced_call_expr",
+}
+
+
+def statement_line(st: t.Any) -> int:
+    """
+    The line a statement starts at. The statements the parser makes up, e.g. for
+    `for` loops, and the expressions in them have the line of their first token.
+    """
+    if getattr(st, "line", 0):
+        return st.line
+    values = list(vars(st).values())
+    while values:
+        value = values.pop(0)
+        if isinstance(value, Token):
+            return value.line
+        if isinstance(value, (e.Expr, stmt.Stmt)):
+            line = statement_line(value)
+            if line:
+                return line
+        elif isinstance(value, (list, tuple)):
+            values[:0] = value
+    return 0
 
 
 class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
@@ -46,10 +94,39 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
 
     def visit_get_expr(self, get_expr: e.Get):
         object_ = self._evaluate(get_expr.object)
-        if isinstance(object_, ClassInstance):
+        if isinstance(object_, (ClassInstance, LoxModule, PythonObject)):
             return object_.get(get_expr.name)
         raise RuntimeException(get_expr.name, "Only instances can have properties")
 
+    def visit_list_expr(self, list_expr: e.ListLiteral):
+        return LoxList([self._evaluate(element) for element in list_expr.elements])
+
+    def visit_map_expr(self, map_expr: e.MapLiteral):
+        map_ = LoxMap()
+        for key, value in map_expr.entries:
+            map_.set_item(map_expr.bracket, self._evaluate(key), self._evaluate(value))
+        return map_
+
+    def visit_index_expr(self, index_expr: e.Index):
+        object_ = self._evaluate(index_expr.object)
+        index = self._evaluate(index_expr.index)
+        if isinstance(object_, Indexable):
+            return object_.get_item(index_expr.bracket, index)
+        if isinstance(object_, str):
+            return object_[to_index(index_expr.bracket, index, len(object_), "String")]
+        raise RuntimeException(index_expr.bracket, "Object is not indexable")
+
+    def visit_index_set_expr(self, index_set: e.IndexSet):
+        object_ = self._evaluate(index_set.object)
+        index = self._evaluate(index_set.index)
+        if not isinstance(object_, Indexable):
+            raise RuntimeException(
+                index_set.bracket, "Object does not support index assignment"
+            )
+        value = self._evaluate(index_set.value)
+        object_.set_item(index_set.bracket, index, value)
+        return value
+
     def visit_class_statement(self, class_stmt: stmt.Class):
         superclass = None
         if class_stmt.superclass is not None:
@@ -71,7 +148,9 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
                 # methods share common enclosing environment that contains `super`
                 # while `this` is bound to the class instance, we `super`
                 # would always refer the the superclass
-                function = Function(method, closure=self._environment)
+                function = Function(
+                    method, closure=self._environment, globals_=self.globals
+                )
                 methods[method.name.lexeme] = function
             klass = Class(class_stmt.name.lexeme, methods, superclass)
 
@@ -94,7 +173,7 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
         raise Return(value)
 
     def visit_function(self, func_stmt: stmt.Function):
-        function = Function(func_stmt, self._environment)
+        function = Function(func_stmt, self._environment, self.globals)
         self._environment.define(func_stmt.name.lexeme, function)
 
     def visit_call_expr(self, call: e.Call):
@@ -107,13 +186,20 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
         if not isinstance(callee, Callable):
             raise RuntimeException(call.paren, "Object is not callable")
         function: Callable = callee
-        if function.arity != len(args):
+        # Natives with `None` arity check the arguments themselves
+        if function.arity is not None and function.arity != len(args):
             raise RuntimeException(
                 call.paren, f"Expected {function.arity} arguments but got {len(args)}"
             )
         # Because the function call itself is an expression, we are just able to return
         # the value.
-        return function.call(self, args)
+        try:
+            return function.call(self, args)
+        except RuntimeException as err:
+            # Natives don't know where they were called from
+            if err.token is None:
+                err.token = call.paren
+            raise
 
     def visit_logical(self, logical: e.Logical):
         left = self._evaluate(logical.left)
@@ -135,14 +221,29 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
         elif if_stmt.else_branch is not None:
             self._execute(if_stmt.else_branch)
 
-    def __init__(self):
-        self.globals = Environment()
+    def __init__(
+        self,
+        python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES,
+        natives: t.Optional[NativeRegistry] = None,
+        directory: Path = Path(),
+        errors: t.Optional[ErrorReporter] = None,
+        stdout: t.Optional[t.TextIO] = None,
+    ):
+        """
+        `python_modules` are the python modules scripts are allowed to import with
+        `pyimport`, `natives` are the natives that could be used by scripts and
+        `directory` is where the modules imported by the script are looked up.
+        Errors are reported to `errors` and `print` writes to `stdout`
+        (`sys.stdout` by default).
+        """
+        self.errors = ErrorReporter() if errors is None else errors
+        self._stdout = stdout
+        self._natives = NativeRegistry() if natives is None else natives
+        self.globals = GlobalEnvironment(self, self._natives, directory)
+        self.python = PythonBridge(self, python_modules)
         self._environment = self.globals
-        self.globals.define("clock", Clock())
-        self.globals.define("getc", GetChar())
-        self.globals.define("chr", Chr())
-        self.globals.define("print_error", PrintError())
-        self.globals.define("exit", Exit())
+        # All stdin natives share one reader, so they can be freely mixed
+        self.stdin = TextReader()
         # `locals` store the distance(where they were declared) of
         # the referenced variable from the
         # current scope(where they are being referenced)
@@ -150,6 +251,19 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
         # referenced as the instance of the class, and different instances are treated
         # as different by python.
         self._locals: t.Dict[e.Expr, int] = {}
+        # Set while `_locals` is the dict of a compiled program, which is shared by
+        # every interpreter that runs it, it's copied before anything is added to it
+        self._shared_locals = False
+        # Imported modules by their resolved path, each module only runs once
+        self.modules: t.Dict[Path, LoxModule] = {}
+        # Modules that were compiled ahead of time, see `modules.precompile`
+        self.compiled_modules: t.Dict[Path, Compiled] = {}
+        self._importing: t.Set[Path] = set()
+        # Runs the top level `await`s, created when the first one runs
+        self._event_loop: t.Optional["asyncio.AbstractEventLoop"] = None
+        self._hook: t.Optional[Hook] = None
+        # The last error an "exception" event was sent for, so it's only sent once
+        self._traced_error: t.Optional[RuntimeException] = None
 
     def visit_assign(self, assignment: e.Assign):
         value = self._evaluate(assignment.value)
@@ -184,7 +298,7 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
 
     def visit_print_statement(self, print_stmt: stmt.Print):
         value = self._evaluate(print_stmt.expression)
-        print(self._stringify(value))
+        print(self._stringify(value), file=self._stdout)
 
     def _evaluate(self, expr: e.Expr):
         return expr.accept(self)
@@ -275,6 +389,12 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
     def _is_equal(a, b):
         return a == b
 
+    def stringify(self, obj: t.Any) -> str:
+        """
+        Text that `print` shows for the object
+        """
+        return self._stringify(obj)
+
     @staticmethod
     def _stringify(obj: t.Any):
         if obj is None:
@@ -286,6 +406,16 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
             return text
         if isinstance(obj, bool):
             return str(obj).lower()
+        if isinstance(obj, LoxList):
+            return "[" + ", ".join(Interpreter._stringify(o) for o in obj) + "]"
+        if isinstance(obj, LoxMap):
+            if not len(obj):
+                return "[:]"
+            stringify = Interpreter._stringify
+            entries = (f"{stringify(k)}: {stringify(v)}" for k, v in obj.items())
+            return "[" + ", ".join(entries) + "]"
+        if isinstance(obj, LoxArray):
+            return "array[" + ", ".join(Interpreter._stringify(o) for o in obj) + "]"
         return str(obj)
 
     def _execute(self, st: stmt.Stmt):
@@ -296,11 +426,314 @@ class Interpreter(e.BaseVisitor, stmt.StmtVisitor):
             for st in statements:
                 self._execute(st)
         except RuntimeException as err:
-            runtime_error(err)
+            self.errors.runtime_error(err)
+        finally:
+            # The loop top-level `await`s ran on, a later run starts a new one
+            if self._event_loop is not None:
+                self._event_loop.close()
+                self._event_loop = None
+
+    def settrace(self, hook: t.Optional[Hook]):
+        """
+        Installs `hook`, which is then called as `hook(event, line, arg)`:
+
+        - "statement" before a statement runs, `arg` is the statement
+        - "call" before a lox function or class is called from lox code, `arg` is
+          the function or class, `line` is the line of the call
+        - "return" after it returned, `arg` is the value it returned
+        - "exception" when a runtime error is raised, `arg` is the error
+
+        `None` removes the hook. There is no check for a hook on the usual path,
+        installing one puts traced versions of the methods that run statements and
+        calls on this interpreter, and removing it takes them off again.
+        """
+        self._hook = hook
+        for name, traced in _TRACED.items():
+            if hook is None:
+                self.__dict__.pop(name, None)
+            else:
+                setattr(self, name, getattr(self, traced))
+
+    def _traced_execute(self, st: stmt.Stmt):
+        line = statement_line(st)
+        self._hook("statement", line, st)
+        try:
+            st.accept(self)
+        except RuntimeException as err:
+            # Sent by the innermost statement only, not again by every enclosing one
+            if err is not self._traced_error:
+                self._traced_error = err
+                self._hook(
+                    "exception", line if err.token is None else err.token.line, err
+                )
+            raise
+
+    def _traced_generate(self, st: stmt.Stmt) -> t.Iterator[t.Any]:
+        # Other statements go through `_execute`, which sends their event
+        if isinstance(st, _GENERATED):
+            self._hook("statement", statement_line(st), st)
+        return Interpreter._generate(self, st)
+
+    def _traced_call_expr(self, call: e.Call):
+        # The same as `visit_call_expr` with the "call" and "return" events
+        callee = self._evaluate(call.callee)
+        args = [self._evaluate(arg) for arg in call.arguments]
+        if not isinstance(callee, Callable):
+            raise RuntimeException(call.paren, "Object is not callable")
+        if callee.arity is not None and callee.arity != len(args):
+            raise RuntimeException(
+                call.paren, f"Expected {callee.arity} arguments but got {len(args)}"
+            )
+        # Natives don't send events
+        traced = isinstance(callee, (Function, Class))
+        if traced:
+            self._hook("call", call.paren.line, callee)
+        try:
+            value = callee.call(self, args)
+        except RuntimeException as err:
+            if err.token is None:
+                err.token = call.paren
+            raise
+        if traced:
+            self._hook("return", call.paren.line, value)
+        return value
+
+    def import_module(self, path: str) -> LoxModule:
+        """
+        Imports the module at `path` like `import` would, raises `RuntimeException`
+        if that fails.
+        """
+        return self._import(Token(tt.STRING, f'"{path}"', path, 0))
+
+    def visit_import_statement(self, import_stmt: stmt.Import):
+        module = self._import(import_stmt.path)
+        self._environment.define(import_stmt.name.lexeme, module)
+
+    def _import(self, path_token: Token) -> LoxModule:
+        path = module_path(self.globals.directory, path_token.literal)
+        module = self.modules.get(path)
+        if module is not None:
+            return module
+        if path in self._importing:
+            raise RuntimeException(
+                path_token, f"Circular import of '{path_token.literal}'"
+            )
+        try:
+            compiled = self._compile(path)
+        except OSError as err:
+            raise RuntimeException(
+                path_token, f"Could not import '{path_token.literal}': {err.strerror}."
+            )
+        except UnicodeDecodeError:
+            raise RuntimeException(
+                path_token, f"Module '{path_token.literal}' is not valid UTF-8."
+            )
+        if compiled is None:
+            raise RuntimeException(
+                path_token, f"Could not compile '{path_token.literal}'"
+            )
+        statements, locals_ = compiled
+        self.add_locals(locals_)
+
+        module = LoxModule(
+            path, GlobalEnvironment(self, self._natives, path.parent, path)
+        )
+        previous_globals = self.globals
+        self.globals = module.globals
+        self._importing.add(path)
+        try:
+            self.execute_block(statements, module.globals)
+        finally:
+            self.globals = previous_globals
+            self._importing.discard(path)
+        self.modules[path] = module
+        return module
+
+    def _compile(self, path: Path) -> t.Optional[Compiled]:
+        # Tools that need the statements of every module (e.g. coverage) replace
+        # this on the interpreter
+        return self.compiled_modules.pop(path, None) or compile_module(
+            path, self.errors
+        )
 
     def visit_while_statement(self, while_stmt: stmt.While):
         while self._is_truthy(self._evaluate(while_stmt.condition)):
             self._execute(while_stmt.block)
 
+    def visit_for_in_statement(self, for_in: stmt.ForIn):
+        values = self._iterate(for_in)
+        previous = self._environment
+        try:
+            if for_in.has_closures:
+                # Every iteration gets its own variable, so closures in the body
+                # capture the value of that iteration
+                for value in values:
+                    self._environment = Environment(previous)
+                    self._environment.define(for_in.name.lexeme, value)
+                    self._execute(for_in.body)
+            else:
+                # Nothing can tell the iterations apart, so the variable is just
+                # stored again for every value
+                self._environment = Environment(previous)
+                for value in values:
+                    self._environment.define(for_in.name.lexeme, value)
+                    self._execute(for_in.body)
+        finally:
+            self._environment = previous
+
+    def _iterate(self, for_in: stmt.ForIn) -> t.Iterator[t.Any]:
+        """
+        Lists, maps (their keys), strings, arrays, buffers, files (their lines) and
+        generators can be iterated. They all follow python's iterator protocol and
+        produce their values lazily.
+        """
+        iterable = self._evaluate(for_in.iterable)
+        if not isinstance(iterable, Iterable):
+            raise RuntimeException(for_in.keyword, "Object is not iterable")
+        if isinstance(iterable, LoxGenerator) and iterable.frames.gi_running:
+            # Iterated from inside its own body
+            raise RuntimeException(for_in.keyword, "Generator is already running")
+        return iter(iterable)
+
+    def visit_yield_statement(self, yield_stmt: stmt.Yield):
+        # `yield` statements only run through `generate`
+        raise RuntimeException(yield_stmt.keyword, "Cannot yield outside of generators")
+
+    def visit_await_statement(self, await_stmt: stmt.Await):
+        # Async functions run their `await`s through `generate`, this is an `await`
+        # at the top level, which runs the event loop until it's done
+        import asyncio
+
+        awaitable = self._awaitable(await_stmt)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # E.g. a module with a top level `await` imported by an async function
+            raise RuntimeException(
+                await_stmt.keyword, "Cannot wait at the top level while async code runs"
+            )
+        if self._event_loop is None:
+            self._event_loop = asyncio.new_event_loop()
+        try:
+            value = self._event_loop.run_until_complete(awaitable)
+        except RuntimeException as err:
+            if err.token is None:
+                err.token = await_stmt.keyword
+            raise
+        if await_stmt.name is not None:
+            self._environment.define(await_stmt.name.lexeme, value)
+
+    def _awaitable(self, await_stmt: stmt.Await) -> t.Awaitable[t.Any]:
+        value = self._evaluate(await_stmt.value)
+        # Lox values are never awaitable by accident, only coroutines and what the
+        # async natives return are
+        if not isinstance(value, Awaitable):
+            raise RuntimeException(await_stmt.keyword, "Object is not awaitable")
+        return value
+
+    def generate(
+        self, statements: t.List[stmt.Stmt]
+    ) -> t.Generator[t.Any, t.Any, t.Any]:
+        """
+        Runs the body of a generator function as a python generator that yields the
+        values of its `yield` statements. It must only be advanced through `resume`,
+        which switches to the environment of the generator and back.
+
+        Async functions run the same way, their `await` statements yield the
+        awaitable and the `await` keyword, and get the result sent back. The value
+        of `return` is the value of the final `StopIteration`.
+
+        Statements that can contain a `yield` are run here, everything else runs
+        through the usual `_execute`.
+        """
+        try:
+            for statement in statements:
+                yield from self._generate(statement)
+        except Return as return_:
+            return return_.value
+
+    def _generate(self, st: stmt.Stmt) -> t.Iterator[t.Any]:
+        # The environment is not restored in `finally` blocks here: if the generator
+        # is abandoned python closes it at some random point later, and `resume`
+        # already restores the environment when an error escapes.
+        if isinstance(st, stmt.Yield):
+            yield None if st.value is None else self._evaluate(st.value)
+        elif isinstance(st, stmt.Await):
+            value = yield self._awaitable(st), st.keyword
+            if st.name is not None:
+                self._environment.define(st.name.lexeme, value)
+        elif isinstance(st, stmt.Block):
+            previous = self._environment
+            self._environment = Environment(previous)
+            for statement in st.statements:
+                yield from self._generate(statement)
+            self._environment = previous
+        elif isinstance(st, stmt.If):
+            if self._is_truthy(self._evaluate(st.condition)):
+                yield from self._generate(st.then_branch)
+            elif st.else_branch is not None:
+                yield from self._generate(st.else_branch)
+        elif isinstance(st, stmt.While):
+            while self._is_truthy(self._evaluate(st.condition)):
+                yield from self._generate(st.block)
+        elif isinstance(st, stmt.ForIn):
+            values = self._iterate(st)
+            previous = self._environment
+            self._environment = Environment(previous)
+            for value in values:
+                if st.has_closures:
+                    self._environment = Environment(previous)
+                self._environment.define(st.name.lexeme, value)
+                yield from self._generate(st.body)
+            self._environment = previous
+        else:
+            self._execute(st)
+
+    def resume(
+        self, generator: t.Union[LoxGenerator, LoxCoroutine], value: t.Any = None
+    ) -> t.Any:
+        """
+        Runs the generator up to its next `yield` and returns the value, raises
+        `StopIteration` when it's done. `value` is sent to the suspended generator,
+        it's the result of the `await` a coroutine is suspended at.
+        """
+        if generator.frames.gi_running:
+            # Natives get the token of their call
+            raise RuntimeException(None, "Generator is already running")
+        previous = self._environment
+        previous_globals = self.globals
+        self._environment = generator.environment
+        self.globals = generator.globals
+        try:
+            return generator.frames.send(value)
+        finally:
+            generator.environment = self._environment
+            self._environment = previous
+            self.globals = previous_globals
+
     def resolve(self, expr: e.Expr, depth: int):
+        self._own_locals()
         self._locals[expr] = depth
+
+    def share_locals(self, locals_: t.Dict[e.Expr, int]):
+        """
+        Uses the resolved locals of a compiled program without copying them, they
+        are only copied if this interpreter needs to add to them.
+        """
+        self._locals = locals_
+        self._shared_locals = True
+
+    def add_locals(self, locals_: t.Dict[e.Expr, int]):
+        """
+        Adds the resolved locals of statements that were compiled separately, e.g. of
+        a module.
+        """
+        self._own_locals()
+        self._locals.update(locals_)
+
+    def _own_locals(self):
+        if self._shared_locals:
+            self._locals = dict(self._locals)
+            self._shared_locals = False
@@ -0,0 +1,170 @@
+"""
+Natives that read stdin and read and write files.
+"""
+
+import mmap
+import typing as t
+
+from ..errors import RuntimeException
+from .callable import Callable
+from .lox_buffer import LoxBuffer
+from .lox_file import LoxFile
+
+
+class GetChar(Callable):
+    @property
+    def arity(self) -> int:
+        return 0
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        char = interpreter.stdin.read_char()
+        if char is None:
+            return float(-1)
+        return float(ord(char))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class ReadLine(Callable):
+    @property
+    def arity(self) -> int:
+        return 0
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # `nil` at the end of input, so an empty line can still be told apart
+        return interpreter.stdin.read_line()
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class ReadAll(Callable):
+    @property
+    def arity(self) -> int:
+        return 0
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        return interpreter.stdin.read_all()
+
+    def __repr__(self):
+        return "<native function>"
+
+
+def _path(value: t.Any) -> str:
+    if not isinstance(value, str):
+        raise RuntimeException(None, "Path must be a string.")
+    return value
+
+
+def _file(value: t.Any) -> LoxFile:
+    if not isinstance(value, LoxFile):
+        raise RuntimeException(None, "Argument must be a file.")
+    return value
+
+
+def _os_error(path: str, err: OSError) -> RuntimeException:
+    return RuntimeException(None, f"Could not access '{path}': {err.strerror}.")
+
+
+class Open(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        path, mode = _path(arguments[0]), arguments[1]
+        if mode not in ("r", "w", "a"):
+            raise RuntimeException(None, "Mode must be 'r', 'w' or 'a'.")
+        try:
+            return LoxFile(path, mode)
+        except OSError as err:
+            raise _os_error(path, err)
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class NextLine(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # `nil` at the end of the file
+        return _file(arguments[0]).read_line()
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Write(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        file, text = _file(arguments[0]), arguments[1]
+        if not isinstance(text, str):
+            raise RuntimeException(None, "Can only write strings.")
+        file.write(text)
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Close(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        _file(arguments[0]).close()
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class ReadFile(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        path = _path(arguments[0])
+        try:
+            with open(path, encoding="utf-8") as file:
+                return file.read()
+        except OSError as err:
+            raise _os_error(path, err)
+        except UnicodeDecodeError:
+            raise RuntimeException(None, f"'{path}' is not valid UTF-8.")
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class ReadBytes(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # The file is memory mapped, so only the pages that are used get read
+        path = _path(arguments[0])
+        try:
+            with open(path, "rb") as file:
+                try:
+                    memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # Empty files can't be mapped
+                    memory = bytes()
+        except OSError as err:
+            raise _os_error(path, err)
+        return LoxBuffer(memory)
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class WriteFile(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # Writes a string or the bytes of a buffer, replacing the file
+        path, data = _path(arguments[0]), arguments[1]
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        elif isinstance(data, LoxBuffer):
+            data = data.view
+        else:
+            raise RuntimeException(None, "Can only write strings and buffers.")
+        try:
+            with open(path, "wb") as file:
+                file.write(data)
+        except OSError as err:
+            raise _os_error(path, err)
+
+    @property
+    def arity(self) -> int:
+        return 2
@@ -0,0 +1,122 @@
+import operator
+import typing as t
+from array import array
+
+from ..errors import RuntimeException
+from ..lexer.token import Token
+from .indexable import Indexable
+from .lox_list import to_index
+
+_numpy: t.Any = None
+
+
+def numpy_module() -> t.Optional[t.Any]:
+    """
+    Returns numpy if it is installed. It is optional and only imported the first
+    time a bulk operation needs it, so it doesn't add to the startup time.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+class LoxArray(Indexable):
+    """
+    Array of numbers stored in one contiguous buffer of C doubles.
+
+    The bulk operations loop in native code instead of going through the
+    interpreter for every element. With numpy they work on a view of the same
+    buffer, so nothing is copied to get there.
+    """
+
+    def __init__(self, data: "array[float]"):
+        self.data = data
+
+    @classmethod
+    def zeros(cls, size: int) -> "LoxArray":
+        return cls(array("d", bytes(8 * size)))
+
+    def view(self) -> t.Optional[t.Any]:
+        """
+        Numpy view of the buffer or `None` without numpy. It must not outlive the
+        operation, the buffer can't be resized while it exists.
+        """
+        numpy = numpy_module()
+        if numpy is None:
+            return None
+        return numpy.frombuffer(self.data, dtype=numpy.float64)
+
+    def get_item(self, token: Token, index: t.Any) -> t.Any:
+        return self.data[to_index(token, index, len(self.data), "Array")]
+
+    def set_item(self, token: t.Optional[Token], index: t.Any, value: t.Any) -> None:
+        position = to_index(token, index, len(self.data), "Array")
+        if not isinstance(value, float):
+            raise RuntimeException(token, "Array elements must be numbers.")
+        self.data[position] = value
+
+    def total(self) -> float:
+        view = self.view()
+        if view is not None:
+            return float(view.sum())
+        return float(sum(self.data))
+
+    def minimum(self) -> float:
+        view = self.view()
+        if view is not None:
+            return float(view.min())
+        return min(self.data)
+
+    def maximum(self) -> float:
+        view = self.view()
+        if view is not None:
+            return float(view.max())
+        return max(self.data)
+
+    def add(self, other: t.Union[float, "LoxArray"]) -> "LoxArray":
+        """
+        Adds a number to every element, or another array of the same length
+        element by element. Returns a new array.
+        """
+        view = self.view()
+        if view is not None:
+            result = LoxArray.zeros(len(self.data))
+            operand = other.view() if isinstance(other, LoxArray) else other
+            numpy_module().add(view, operand, out=result.view())
+            return result
+        if isinstance(other, LoxArray):
+            return LoxArray(array("d", map(operator.add, self.data, other.data)))
+        return LoxArray(array("d", map(other.__add__, self.data)))
+
+    def scale(self, factor: float) -> "LoxArray":
+        view = self.view()
+        if view is not None:
+            result = LoxArray.zeros(len(self.data))
+            numpy_module().multiply(view, factor, out=result.view())
+            return result
+        return LoxArray(array("d", map(factor.__mul__, self.data)))
+
+    def dot(self, other: "LoxArray") -> float:
+        view = self.view()
+        if view is not None:
+            return float(view.dot(other.view()))
+        return float(sum(map(operator.mul, self.data, other.data)))
+
+    def sort(self) -> None:
+        view = self.view()
+        if view is not None:
+            # Sorts the buffer in place
+            view.sort()
+            return
+        self.data[:] = array("d", sorted(self.data))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
@@ -0,0 +1,113 @@
+import struct
+import typing as t
+
+from ..errors import RuntimeException
+from ..lexer.token import Token
+from .indexable import Indexable
+from .lox_list import to_bounds, to_index
+
+# Little endian struct formats by size
+_INT_FORMATS = {1: "<b", 2: "<h", 4: "<i", 8: "<q"}
+_UINT_FORMATS = {1: "<B", 2: "<H", 4: "<I", 8: "<Q"}
+_FLOAT_FORMATS = {4: "<f", 8: "<d"}
+
+
+class LoxBuffer(Indexable):
+    """
+    Fixed size sequence of bytes.
+
+    It is a `memoryview` over the underlying memory, so slices are views that share
+    the bytes with the buffer they were taken from instead of copying them.
+    """
+
+    def __init__(self, memory: t.Any):
+        self.view = memoryview(memory).cast("B")
+
+    @classmethod
+    def zeros(cls, size: int) -> "LoxBuffer":
+        return cls(bytearray(size))
+
+    def slice(self, start: t.Any, end: t.Any) -> "LoxBuffer":
+        start, end = to_bounds(None, start, end, len(self.view))
+        return LoxBuffer(self.view[start:end])
+
+    def get_item(self, token: Token, index: t.Any) -> t.Any:
+        return float(self.view[to_index(token, index, len(self.view), "Buffer")])
+
+    def set_item(self, token: t.Optional[Token], index: t.Any, value: t.Any) -> None:
+        position = to_index(token, index, len(self.view), "Buffer")
+        if not (isinstance(value, float) and value.is_integer() and 0 <= value < 256):
+            raise RuntimeException(token, "Bytes must be integers between 0 and 255.")
+        self._check_writable(token)
+        self.view[position] = int(value)
+
+    def _check_writable(self, token: t.Optional[Token]):
+        if self.view.readonly:
+            raise RuntimeException(token, "Buffer is read-only.")
+
+    def _offset(self, offset: t.Any, size: int) -> int:
+        if not isinstance(offset, float) or not offset.is_integer():
+            raise RuntimeException(None, "Offset must be an integer.")
+        if not 0 <= offset <= len(self.view) - size:
+            raise RuntimeException(None, "Offset out of range.")
+        return int(offset)
+
+    @staticmethod
+    def _format(formats: t.Dict[int, str], size: t.Any) -> str:
+        # `4.0` finds the key `4`
+        if isinstance(size, float) and size in formats:
+            return formats[size]
+        sizes = ", ".join(str(s) for s in formats)
+        raise RuntimeException(None, f"Size must be one of {sizes}.")
+
+    def read(self, offset: t.Any, size: t.Any, kind: str) -> float:
+        """
+        Reads a little endian number. `kind` is one of "int", "uint" or "float".
+        """
+        formats = {"int": _INT_FORMATS, "uint": _UINT_FORMATS, "float": _FLOAT_FORMATS}
+        format_ = self._format(formats[kind], size)
+        (value,) = struct.unpack_from(format_, self.view, self._offset(offset, size))
+        return float(value)
+
+    def write(self, offset: t.Any, size: t.Any, kind: str, value: t.Any) -> None:
+        """
+        Writes a little endian number. Integers can be given in the signed or the
+        unsigned range. `kind` is one of "int" or "float".
+        """
+        if not isinstance(value, float):
+            raise RuntimeException(None, "Value must be a number.")
+        self._check_writable(None)
+        if kind == "float":
+            format_ = self._format(_FLOAT_FORMATS, size)
+            start = self._offset(offset, size)
+            try:
+                struct.pack_into(format_, self.view, start, value)
+            except (struct.error, OverflowError):
+                # Too large for a 2 or 4 byte float
+                raise RuntimeException(None, "Value doesn't fit in the given size.")
+            return
+        format_ = self._format(_INT_FORMATS, size)
+        if not value.is_integer():
+            raise RuntimeException(None, "Value must be an integer.")
+        number = int(value)
+        bits = 8 * int(size)
+        if not -(1 << (bits - 1)) <= number < (1 << bits):
+            raise RuntimeException(None, "Value doesn't fit in the given size.")
+        if number >= 1 << (bits - 1):
+            format_ = format_.upper()
+        struct.pack_into(format_, self.view, self._offset(offset, size), number)
+
+    def decode(self) -> str:
+        try:
+            return str(self.view, "utf-8")
+        except UnicodeDecodeError:
+            raise RuntimeException(None, "Buffer is not valid UTF-8.")
+
+    def __len__(self):
+        return len(self.view)
+
+    def __iter__(self):
+        return (float(byte) for byte in self.view)
+
+    def __str__(self):
+        return f"<buffer of {len(self.view)} bytes>"
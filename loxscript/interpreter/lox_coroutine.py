@@ -0,0 +1,73 @@
+import typing as t
+
+from ..errors import RuntimeException
+from ..parser import stmt
+from .environment import Environment
+
+if t.TYPE_CHECKING:
+    import asyncio
+
+
+class LoxCoroutine:
+    """
+    What calling an async function returns, it could be awaited by lox code and by
+    python code running on the same event loop.
+
+    The body runs like the body of a generator (`Interpreter.generate`), suspended
+    at every `await`. The awaited values are passed out and awaited on the event
+    loop, so the interpreter is free to run other coroutines in the meantime.
+    """
+
+    def __init__(
+        self,
+        interpreter,
+        declaration: stmt.Function,
+        environment: Environment,
+        globals_: Environment,
+    ):
+        self._interpreter = interpreter
+        self._name = declaration.name.lexeme
+        self.environment = environment
+        self.globals = globals_
+        self.frames = interpreter.generate(declaration.body)
+        self._task: t.Optional["asyncio.Future"] = None
+        # The coroutine this one is suspended on, to find cycles of awaits
+        self._awaiting: t.Optional["LoxCoroutine"] = None
+
+    def __await__(self):
+        # asyncio takes a while to import, scripts that never await don't pay for it
+        import asyncio
+
+        # The body starts when it's first awaited and only runs once, awaiting it
+        # again gives the same result
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self._task.__await__()
+
+    async def _run(self) -> t.Any:
+        value = None
+        while True:
+            try:
+                awaitable, keyword = self._interpreter.resume(self, value)
+            except StopIteration as stop:
+                return stop.value
+            # Waiting for itself, also through other coroutines, would never end
+            awaited = awaitable
+            while isinstance(awaited, LoxCoroutine):
+                if awaited is self:
+                    raise RuntimeException(keyword, "A coroutine cannot await itself")
+                awaited = awaited._awaiting
+            if isinstance(awaitable, LoxCoroutine):
+                self._awaiting = awaitable
+            try:
+                value = await awaitable
+            except RuntimeException as err:
+                # Natives don't know where they were awaited
+                if err.token is None:
+                    err.token = keyword
+                raise
+            finally:
+                self._awaiting = None
+
+    def __str__(self):
+        return f"<coroutine {self._name}>"
@@ -0,0 +1,126 @@
+import sys
+import typing as t
+
+from ..errors import RuntimeException
+
+
+class TextReader:
+    """
+    Buffered reader over a text stream.
+
+    Input is pulled in bounded chunks and consumed by moving an index through the
+    current chunk, so reading N characters costs O(N) no matter whether they are
+    read one at a time, line by line or all at once. Nothing is read until it is
+    asked for, which also keeps interactive input working.
+    """
+
+    _CHUNK_SIZE = 1 << 16
+
+    def __init__(self, stream: t.Optional[t.TextIO] = None):
+        # `None` means `sys.stdin`, looked up on first read so that redirections
+        # done after the interpreter is created are respected.
+        self._stream = stream
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """
+        Replaces the consumed buffer with the next chunk. Returns false at EOF.
+        """
+        if self._eof:
+            return False
+        if self._stream is None:
+            self._stream = sys.stdin
+        # `readline` with a limit returns as soon as a line is available, which
+        # `read` doesn't do for terminals, and still bounds the chunk size.
+        chunk = self._stream.readline(self._CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = chunk
+        self._pos = 0
+        return True
+
+    def read_char(self) -> t.Optional[str]:
+        if self._pos >= len(self._buffer) and not self._fill():
+            return None
+        char = self._buffer[self._pos]
+        self._pos += 1
+        return char
+
+    def read_line(self) -> t.Optional[str]:
+        """
+        Returns the next line without its line terminator or `None` at EOF.
+        """
+        parts = []
+        while self._pos < len(self._buffer) or self._fill():
+            end = self._buffer.find("\n", self._pos)
+            if end != -1:
+                parts.append(self._buffer[self._pos : end])
+                self._pos = end + 1
+                return "".join(parts)
+            parts.append(self._buffer[self._pos :])
+            self._pos = len(self._buffer)
+        if not parts:
+            return None
+        return "".join(parts)
+
+    def read_all(self) -> str:
+        parts = [self._buffer[self._pos :]]
+        self._buffer = ""
+        self._pos = 0
+        if not self._eof:
+            if self._stream is None:
+                self._stream = sys.stdin
+            parts.append(self._stream.read())
+            self._eof = True
+        return "".join(parts)
+
+
+class LoxFile:
+    """
+    Text file opened from lox. Reads go through a `TextReader` and writes through
+    python's buffered writer, so files of any size are streamed in chunks.
+    """
+
+    _BUFFER_SIZE = 1 << 20
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self._mode = mode
+        self._file = open(path, mode, encoding="utf-8", buffering=self._BUFFER_SIZE)
+        self._reader = TextReader(self._file) if mode == "r" else None
+
+    def _check(self, reading: bool):
+        if self._file.closed:
+            raise RuntimeException(None, "File is closed.")
+        if reading and self._reader is None:
+            raise RuntimeException(None, "File is not open for reading.")
+        if not reading and self._reader is not None:
+            raise RuntimeException(None, "File is not open for writing.")
+
+    def read_line(self) -> t.Optional[str]:
+        self._check(reading=True)
+        try:
+            return self._reader.read_line()
+        except UnicodeDecodeError:
+            raise RuntimeException(None, f"'{self.path}' is not valid UTF-8.")
+
+    def write(self, text: str) -> None:
+        self._check(reading=False)
+        self._file.write(text)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __iter__(self) -> t.Iterator[str]:
+        # The lines that are left, the file is closed after the last one
+        line = self.read_line()
+        while line is not None:
+            yield line
+            line = self.read_line()
+        self.close()
+
+    def __str__(self):
+        return f"<file {self.path}>"
@@ -0,0 +1,36 @@
+import typing as t
+
+from ..parser import stmt
+from .environment import Environment
+
+
+class LoxGenerator:
+    """
+    What calling a generator function returns.
+
+    The body runs as a python generator (`Interpreter.generate`) that is suspended at
+    every `yield`, together with the environment it was suspended in. So nothing
+    runs until a value is asked for and values are produced one at a time.
+    """
+
+    def __init__(
+        self,
+        interpreter,
+        declaration: stmt.Function,
+        environment: Environment,
+        globals_: Environment,
+    ):
+        self._interpreter = interpreter
+        self._name = declaration.name.lexeme
+        self.environment = environment
+        self.globals = globals_
+        self.frames = interpreter.generate(declaration.body)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> t.Any:
+        return self._interpreter.resume(self)
+
+    def __str__(self):
+        return f"<generator {self._name}>"
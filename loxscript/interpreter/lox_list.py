@@ -0,0 +1,52 @@
+import typing as t
+
+from ..errors import RuntimeException
+from ..lexer.token import Token
+from .indexable import Indexable
+
+
+def to_index(token: Token, index: t.Any, length: int, kind: str = "List") -> int:
+    """
+    Converts a lox number to a python index, checking that it is within
+    `0 <= index < length`.
+    """
+    if not isinstance(index, float) or not index.is_integer():
+        raise RuntimeException(token, f"{kind} index must be an integer.")
+    position = int(index)
+    if not 0 <= position < length:
+        raise RuntimeException(token, f"{kind} index out of range.")
+    return position
+
+
+def to_bounds(
+    token: t.Optional[Token], start: t.Any, end: t.Any, length: int
+) -> t.Tuple[int, int]:
+    """
+    Converts lox numbers to python slice bounds, checking that
+    `0 <= start <= end <= length`.
+    """
+    for bound in (start, end):
+        if not isinstance(bound, float) or not bound.is_integer():
+            raise RuntimeException(token, "Slice bounds must be integers.")
+    start, end = int(start), int(end)
+    if not 0 <= start <= end <= length:
+        raise RuntimeException(token, "Slice out of range.")
+    return start, end
+
+
+class LoxList(Indexable):
+    def __init__(self, elements: t.List[t.Any]):
+        # The python list is used as is, so appending is amortized O(1)
+        self.elements = elements
+
+    def get_item(self, token: Token, index: t.Any) -> t.Any:
+        return self.elements[to_index(token, index, len(self.elements))]
+
+    def set_item(self, token: Token, index: t.Any, value: t.Any) -> None:
+        self.elements[to_index(token, index, len(self.elements))] = value
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __iter__(self):
+        return iter(self.elements)
@@ -0,0 +1,68 @@
+import typing as t
+
+from ..errors import RuntimeException
+from ..lexer.token import Token
+from .indexable import Indexable
+
+
+class _BoolKey:
+    def __init__(self, value: bool):
+        self.value = value
+
+
+# Python treats `true` and `1` as the same key, lox doesn't. So booleans are
+# stored under these instead, they are only equal to themselves.
+_BOOL_KEYS = {True: _BoolKey(True), False: _BoolKey(False)}
+_MISSING = object()
+
+
+def hash_key(key: t.Any) -> t.Any:
+    """
+    Converts a lox value to the key it is stored under.
+
+    Numbers, strings and `nil` are keys by value, booleans are kept apart from
+    numbers and everything else (instances, functions, lists, ...) is a key by
+    identity, which matches what `==` does for them.
+    """
+    if key is True or key is False:
+        return _BOOL_KEYS[key]
+    return key
+
+
+def _unhash_key(key: t.Any) -> t.Any:
+    if isinstance(key, _BoolKey):
+        return key.value
+    return key
+
+
+class LoxMap(Indexable):
+    def __init__(self):
+        self._entries: t.Dict[t.Any, t.Any] = {}
+
+    def get_item(self, token: Token, key: t.Any) -> t.Any:
+        try:
+            return self._entries[hash_key(key)]
+        except KeyError:
+            raise RuntimeException(token, "Key not found in map.")
+
+    def set_item(self, token: t.Optional[Token], key: t.Any, value: t.Any) -> None:
+        self._entries[hash_key(key)] = value
+
+    def has(self, key: t.Any) -> bool:
+        return hash_key(key) in self._entries
+
+    def delete(self, key: t.Any) -> bool:
+        return self._entries.pop(hash_key(key), _MISSING) is not _MISSING
+
+    def keys(self) -> t.List[t.Any]:
+        return [_unhash_key(key) for key in self._entries]
+
+    def items(self) -> t.Iterator[t.Tuple[t.Any, t.Any]]:
+        return ((_unhash_key(key), value) for key, value in self._entries.items())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        # Iterates over a copy of the keys, so the map can change meanwhile
+        return iter(self.keys())
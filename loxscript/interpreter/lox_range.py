@@ -0,0 +1,40 @@
+import itertools
+import typing as t
+
+from ..errors import RuntimeException
+
+
+class LoxRange:
+    """
+    Numbers from `start` up to, but not including, `stop` going by `step`.
+
+    Iterating it counts in python, no lox arithmetic or comparison runs per step,
+    and the numbers are produced lazily.
+    """
+
+    def __init__(self, start: float, stop: float, step: float):
+        if step == 0:
+            raise RuntimeException(None, "Range step cannot be zero.")
+        self._start = start
+        self._stop = stop
+        self._step = step
+
+    def _is_integral(self) -> bool:
+        return all(n.is_integer() for n in (self._start, self._stop, self._step))
+
+    def __iter__(self) -> t.Iterator[float]:
+        if self._is_integral():
+            return map(float, range(int(self._start), int(self._stop), int(self._step)))
+        # Multiplying instead of adding up the steps doesn't accumulate errors
+        values = (self._start + i * self._step for i in itertools.count())
+        if self._step > 0:
+            return itertools.takewhile(self._stop.__gt__, values)
+        return itertools.takewhile(self._stop.__lt__, values)
+
+    def __len__(self):
+        if self._is_integral():
+            return len(range(int(self._start), int(self._stop), int(self._step)))
+        return max(0, -int((self._start - self._stop) // self._step))
+
+    def __str__(self):
+        return "<range>"
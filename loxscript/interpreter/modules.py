@@ -0,0 +1,221 @@
+import hashlib
+import os
+import pickle
+import typing as t
+from contextlib import ExitStack, suppress
+from pathlib import Path
+
+from ..errors import RuntimeException
+from ..handle_errors import ErrorReporter
+from ..lexer.scanner import Scanner
+from ..lexer.token import Token
+from ..parser import expr as e
+from ..parser import stmt
+from ..parser.parser import Parser
+from .registry import GlobalEnvironment
+from .resolver import Resolver
+
+if t.TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# Compiled modules are cached next to their source, like `__pycache__`
+CACHE_DIRECTORY = "__loxcache__"
+# Must be bumped whenever the syntax tree classes change, so that stale caches are
+# compiled again instead of being loaded.
+CACHE_VERSION = 3
+
+Compiled = t.Tuple[t.List[stmt.Stmt], t.Dict[e.Expr, int]]
+
+
+class LoxModule:
+    """
+    What `import` binds. Its properties are the globals of the module.
+    """
+
+    def __init__(self, path: Path, globals_: GlobalEnvironment):
+        self.name = path.stem
+        self.path = path
+        self.globals = globals_
+
+    def get(self, name: Token) -> t.Any:
+        if not self.globals.defines(name.lexeme):
+            raise RuntimeException(name, f"Undefined property {name.lexeme}")
+        return self.globals.get(name)
+
+    def __str__(self):
+        return f"<module {self.name}>"
+
+
+class _Locals:
+    """
+    Takes the place of the interpreter for the resolver, so the resolved distances
+    of a module could be cached along with its statements.
+    """
+
+    def __init__(self):
+        self.locals: t.Dict[e.Expr, int] = {}
+
+    def resolve(self, expr: e.Expr, depth: int):
+        self.locals[expr] = depth
+
+
+def compile_source(source: str, errors: ErrorReporter) -> t.Optional[Compiled]:
+    """
+    Scans, parses and resolves `source`. Returns `None` if there were any errors,
+    they are reported to `errors`.
+    """
+    reported = len(errors.diagnostics)
+    statements = Parser(Scanner(source, errors).get_tokens(), errors).parse()
+    if len(errors.diagnostics) > reported:
+        return None
+    resolved = _Locals()
+    Resolver(resolved, errors).resolve(statements)
+    if len(errors.diagnostics) > reported:
+        return None
+    return statements, resolved.locals
+
+
+def _cache_path(path: Path) -> Path:
+    return path.parent / CACHE_DIRECTORY / f"{path.name}.pickle"
+
+
+def _load_cache(path: Path, key: str) -> t.Optional[Compiled]:
+    try:
+        with _cache_path(path).open("rb") as file:
+            version, cached_key, compiled = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception:  # A broken cache is compiled again, it's never fatal
+        return None
+    if version != CACHE_VERSION or cached_key != key:
+        return None
+    return compiled
+
+
+def _write_cache(path: Path, key: str, compiled: Compiled):
+    cache = _cache_path(path)
+    temporary = cache.with_name(f"{cache.name}.{os.getpid()}")
+    try:
+        cache.parent.mkdir(exist_ok=True)
+        with temporary.open("wb") as file:
+            pickle.dump((CACHE_VERSION, key, compiled), file, pickle.HIGHEST_PROTOCOL)
+        # Other processes only ever see a complete cache
+        os.replace(temporary, cache)
+    except (OSError, pickle.PicklingError, RecursionError):
+        # Not being able to cache (read-only directory, very deep syntax tree...)
+        # only makes the next import slower
+        with suppress(OSError):
+            temporary.unlink()
+
+
+def compile_module(path: Path, errors: ErrorReporter) -> t.Optional[Compiled]:
+    """
+    Compiles the module at `path`, or loads it from the cache if the source hasn't
+    changed since it was last compiled. Raises `OSError` if the module can't be read.
+    """
+    source = path.read_bytes()
+    key = hashlib.sha256(source).hexdigest()
+    compiled = _load_cache(path, key)
+    if compiled is None:
+        compiled = compile_source(source.decode("utf-8"), errors)
+        if compiled is not None:
+            _write_cache(path, key, compiled)
+    return compiled
+
+
+def module_path(directory: Path, path: str) -> Path:
+    return (directory / path).resolve()
+
+
+def _imports(statements: t.Iterable[stmt.Stmt]) -> t.Iterator[stmt.Import]:
+    """
+    All the `import` statements in `statements`, including the ones nested in
+    blocks, functions and classes.
+    """
+    for statement in statements:
+        if isinstance(statement, stmt.Import):
+            yield statement
+        elif isinstance(statement, stmt.Block):
+            yield from _imports(statement.statements)
+        elif isinstance(statement, stmt.If):
+            yield from _imports((statement.then_branch, statement.else_branch))
+        elif isinstance(statement, stmt.While):
+            yield from _imports((statement.block,))
+        elif isinstance(statement, stmt.ForIn):
+            yield from _imports((statement.body,))
+        elif isinstance(statement, stmt.Function):
+            yield from _imports(statement.body)
+        elif isinstance(statement, stmt.Class):
+            yield from _imports(statement.methods)
+
+
+def _load_cached(path: Path) -> t.Optional[Compiled]:
+    try:
+        source = path.read_bytes()
+    except OSError:
+        return None
+    return _load_cache(path, hashlib.sha256(source).hexdigest())
+
+
+def _compile_in_worker(path: Path) -> t.Optional[Compiled]:
+    # A module with errors is left to be compiled again when it's imported, so the
+    # errors are reported at the usual time and only once.
+    try:
+        return compile_module(path, ErrorReporter(echo=False))
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def precompile(
+    statements: t.List[stmt.Stmt], directory: Path, jobs: t.Optional[int] = None
+) -> t.Dict[Path, Compiled]:
+    """
+    Compiles every module `statements` import, directly or through other modules,
+    across `jobs` processes (as many as there are cores by default). Modules are
+    compiled as soon as they are found, so independent modules are compiled at the
+    same time, and modules with an up to date cache are never sent to a process.
+
+    Returns the compiled modules by their path. Modules that couldn't be compiled
+    are left out, they are compiled again when they are imported.
+    """
+    # Importing multiprocessing takes a while, scripts run with one job don't
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    compiled: t.Dict[Path, Compiled] = {}
+    seen: t.Set[Path] = set()
+    pending: t.Dict["Future[Compiled]", Path] = {}
+
+    with ExitStack() as stack:
+        pool: t.Optional[ProcessPoolExecutor] = None
+
+        def discover(statements: t.List[stmt.Stmt], directory: Path):
+            nonlocal pool
+            for import_stmt in _imports(statements):
+                path = module_path(directory, import_stmt.path.literal)
+                if path in seen:
+                    continue
+                seen.add(path)
+                cached = _load_cached(path)
+                if cached is not None:
+                    compiled[path] = cached
+                    discover(cached[0], path.parent)
+                    continue
+                if pool is None:
+                    # Starting the processes only pays off when something needs to
+                    # be compiled
+                    pool = stack.enter_context(ProcessPoolExecutor(jobs))
+                pending[pool.submit(_compile_in_worker, path)] = path
+
+        discover(statements, directory)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception:  # e.g. too deep to send back, compiled on import
+                    continue
+                if result is not None:
+                    compiled[path] = result
+                    discover(result[0], path.parent)
+    return compiled
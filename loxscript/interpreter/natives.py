@@ -1,8 +1,23 @@
+"""
+The core natives: the clock, exiting, lengths and the list and map natives. The
+natives of other areas are in modules of their own (`io_natives`,
+`string_natives`, `array_natives`, `buffer_natives`, ...), so a script only
+imports the areas it uses.
+"""
+
+import math
 import sys
 import time
 import typing as t
+from collections.abc import Sized
 
+from ..errors import RuntimeException
 from .callable import Callable
+from .lox_array import LoxArray
+from .lox_buffer import LoxBuffer
+from .lox_list import LoxList, to_bounds
+from .lox_map import LoxMap
+from .lox_range import LoxRange
 
 
 class Clock(Callable):
@@ -17,51 +32,190 @@ class Clock(Callable):
         return "<native function>"
 
 
-class GetChar(Callable):
-    def __init__(self):
-        self._input_text = None
+class Chr(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        return chr(int(arguments[0]))
 
     @property
     def arity(self) -> int:
-        return 0
+        return 1
 
+
+class Exit(Callable):
     def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
-        if self._input_text is None:
-            inp = sys.stdin
-            self._input_text = ""
-            for line in inp:
-                self._input_text += line
-        if len(self._input_text) == 0:
-            return float(-1)
-        current_char = self._input_text[0]
-        self._input_text = self._input_text[1:]
-        return float(ord(current_char))
+        exit(arguments[0])
 
-    def __repr__(self):
-        return "<native function>"
+    @property
+    def arity(self) -> int:
+        return 1
 
 
-class Chr(Callable):
+class PrintError(Callable):
     def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
-        return chr(int(arguments[0]))
+        print(arguments[0], file=sys.stderr)
 
     @property
     def arity(self) -> int:
         return 1
 
 
-class Exit(Callable):
+def _string(value: t.Any) -> str:
+    if not isinstance(value, str):
+        raise RuntimeException(None, "Argument must be a string.")
+    return value
+
+
+# Natives raise `RuntimeException` without a token, the interpreter attaches the
+# token of the call so that the error is reported on the right line.
+
+
+class Len(Callable):
     def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
-        exit(arguments[0])
+        value = arguments[0]
+        if not isinstance(value, Sized):
+            raise RuntimeException(None, "Object has no length.")
+        return float(len(value))
 
     @property
     def arity(self) -> int:
         return 1
 
 
-class PrintError(Callable):
+class Push(Callable):
     def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
-        print(arguments[0], file=sys.stderr)
+        list_, value = arguments
+        if isinstance(list_, LoxArray):
+            if not isinstance(value, float):
+                raise RuntimeException(None, "Array elements must be numbers.")
+            list_.data.append(value)
+            return
+        if not isinstance(list_, LoxList):
+            raise RuntimeException(None, "Can only push to a list or an array.")
+        list_.elements.append(value)
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Pop(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        list_ = arguments[0]
+        if isinstance(list_, LoxArray):
+            if not list_.data:
+                raise RuntimeException(None, "Cannot pop from an empty array.")
+            return list_.data.pop()
+        if not isinstance(list_, LoxList):
+            raise RuntimeException(None, "Can only pop from a list or an array.")
+        if not list_.elements:
+            raise RuntimeException(None, "Cannot pop from an empty list.")
+        return list_.elements.pop()
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Slice(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        value, start, end = arguments
+        if isinstance(value, LoxList):
+            start, end = to_bounds(None, start, end, len(value.elements))
+            return LoxList(value.elements[start:end])
+        if isinstance(value, str):
+            start, end = to_bounds(None, start, end, len(value))
+            return value[start:end]
+        if isinstance(value, LoxArray):
+            start, end = to_bounds(None, start, end, len(value.data))
+            return LoxArray(value.data[start:end])
+        if isinstance(value, LoxBuffer):
+            # A view of the same bytes, not a copy
+            return value.slice(start, end)
+        raise RuntimeException(
+            None, "Can only slice lists, strings, arrays and buffers."
+        )
+
+    @property
+    def arity(self) -> int:
+        return 3
+
+
+class Has(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        map_, key = arguments
+        if not isinstance(map_, LoxMap):
+            raise RuntimeException(None, "Argument must be a map.")
+        return map_.has(key)
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Delete(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # Returns whether the key was there
+        map_, key = arguments
+        if not isinstance(map_, LoxMap):
+            raise RuntimeException(None, "Argument must be a map.")
+        return map_.delete(key)
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Keys(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        map_ = arguments[0]
+        if not isinstance(map_, LoxMap):
+            raise RuntimeException(None, "Argument must be a map.")
+        return LoxList(map_.keys())
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Sort(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # Sorts in place
+        value = arguments[0]
+        if isinstance(value, LoxArray):
+            value.sort()
+            return
+        if isinstance(value, LoxList):
+            elements = value.elements
+            if all(isinstance(element, float) for element in elements) or all(
+                isinstance(element, str) for element in elements
+            ):
+                elements.sort()
+                return
+            raise RuntimeException(None, "Can only sort numbers or strings.")
+        raise RuntimeException(None, "Can only sort lists and arrays.")
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Range(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        if not all(isinstance(argument, float) for argument in arguments):
+            raise RuntimeException(None, "Range bounds and step must be numbers.")
+        if not all(math.isfinite(argument) for argument in arguments):
+            raise RuntimeException(None, "Range bounds and step must be finite.")
+        return LoxRange(*arguments)
+
+    @property
+    def arity(self) -> int:
+        return 3
+
+
+class PyImport(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # `pyimport("math")` or `pyimport("math.sqrt")`, only allowed modules
+        return interpreter.python.import_(_string(arguments[0]))
 
     @property
     def arity(self) -> int:
@@ -0,0 +1,291 @@
+"""
+Natives that run lox functions in worker processes, so CPU-bound work isn't held
+to one core:
+
+    var squares = parallelMap(square, [1, 2, 3]);
+    var task = spawn(work, 10, "fast");
+    print wait(task);
+
+Only top-level functions of a script file could run in a worker. A worker compiles
+the file once (without writing a cache next to it, like running the script
+doesn't), runs its function and class declarations and imports, and keeps that
+interpreter for the next tasks. Other statements of the script don't run in the
+workers, so the function can't use global variables. The imported modules do run
+in every worker that loads the script, so whatever their top-level statements do
+happens once per worker.
+
+Arguments and results are copied, they could be `nil`, booleans, numbers,
+strings, arrays, and lists and maps of those.
+"""
+
+import math
+import os
+import typing as t
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from ..errors import RuntimeException
+from ..handle_errors import ErrorReporter
+from ..lexer.token import Token
+from ..lexer.token_type import TokenType as tt
+from ..parser import stmt
+from .callable import Callable, Function
+from .interpreter import Interpreter
+from .lox_array import LoxArray
+from .lox_list import LoxList
+from .lox_map import LoxMap
+from .modules import compile_source
+
+# What a worker runs of the script
+_DECLARATIONS = (stmt.Function, stmt.Class, stmt.Import)
+
+# Every call gives `(True, result)` or `(False, error message)`
+_Outcome = t.Tuple[bool, t.Any]
+
+
+class _Map(t.NamedTuple):
+    # A map as it's sent between processes, the keys keep their lox types
+    entries: t.List[t.Tuple[t.Any, t.Any]]
+
+
+def _encode(value: t.Any) -> t.Any:
+    if value is None or isinstance(value, (bool, float, str)):
+        return value
+    if isinstance(value, LoxList):
+        return [_encode(element) for element in value.elements]
+    if isinstance(value, LoxMap):
+        return _Map(
+            [(_encode(key), _encode(element)) for key, element in value.items()]
+        )
+    if isinstance(value, LoxArray):
+        return value.data
+    raise ValueError(value)
+
+
+def _decode(value: t.Any) -> t.Any:
+    if isinstance(value, list):
+        return LoxList([_decode(element) for element in value])
+    if isinstance(value, _Map):
+        map_ = LoxMap()
+        for key, element in value.entries:
+            map_.set_item(None, _decode(key), _decode(element))
+        return map_
+    if isinstance(value, array):
+        return LoxArray(value)
+    return value
+
+
+# Interpreters of the workers, by the script they were loaded from
+_interpreters: t.Dict[t.Tuple[t.Any, ...], Interpreter] = {}
+
+
+def _load(script: str, python_modules: t.Tuple[str, ...]) -> Interpreter:
+    path = Path(script)
+    stat = path.stat()
+    key = (script, stat.st_mtime_ns, stat.st_size, python_modules)
+    interpreter = _interpreters.get(key)
+    if interpreter is None:
+        errors = ErrorReporter(echo=False)
+        interpreter = Interpreter(python_modules, directory=path.parent, errors=errors)
+        interpreter.globals.path = path
+        compiled = compile_source(path.read_text(), errors)
+        if compiled is not None:
+            statements, locals_ = compiled
+            interpreter.add_locals(locals_)
+            interpreter.interpret(
+                [st for st in statements if isinstance(st, _DECLARATIONS)]
+            )
+        if errors.has_any_error():
+            raise ValueError(f"Could not load '{script}' in a worker.")
+        _interpreters[key] = interpreter
+    return interpreter
+
+
+def _run_calls(
+    script: str,
+    python_modules: t.Tuple[str, ...],
+    name: str,
+    calls: t.List[t.List[t.Any]],
+) -> t.List[_Outcome]:
+    # Runs in a worker
+    try:
+        interpreter = _load(script, python_modules)
+    except OSError as err:
+        return [(False, f"Could not read '{script}': {err.strerror}.")] * len(calls)
+    except ValueError as err:
+        return [(False, str(err))] * len(calls)
+    function = interpreter.globals.get(Token(tt.IDENTIFIER, name, None, 0))
+    return [_call(interpreter, function, arguments) for arguments in calls]
+
+
+def _call(
+    interpreter: Interpreter, function: Function, arguments: t.List[t.Any]
+) -> _Outcome:
+    try:
+        value = function.call(interpreter, [_decode(arg) for arg in arguments])
+    except RuntimeException as err:
+        line = "" if err.token is None else f" at line {err.token.line}"
+        return False, f"{err} ({function.name}{line} in a worker)"
+    try:
+        return True, _encode(value)
+    except ValueError:
+        return False, f"The result of '{function.name}' can't be sent back."
+
+
+def _result(outcome: _Outcome) -> t.Any:
+    succeeded, value = outcome
+    if not succeeded:
+        raise RuntimeException(None, value)
+    return _decode(value)
+
+
+_pool: t.Optional[ProcessPoolExecutor] = None
+
+
+def _workers() -> ProcessPoolExecutor:
+    # Started on first use and shared by every interpreter in the process
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor()
+    return _pool
+
+
+def _outcomes(future: "Future[t.List[_Outcome]]") -> t.List[_Outcome]:
+    global _pool
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        # A worker died, e.g. the C stack overflowed. The next task starts a new pool
+        _pool = None
+        raise RuntimeException(None, "A worker process crashed.")
+
+
+def _target(function: t.Any, arity: int) -> t.Tuple[str, str]:
+    """
+    The script and the name of `function`, which is called with `arity` arguments.
+    """
+    if not isinstance(function, Function) or not function.is_top_level:
+        raise RuntimeException(None, "Only top-level functions can run in a worker.")
+    path = function.globals.path
+    if path is None:
+        raise RuntimeException(
+            None, "Only functions declared in a script file can run in a worker."
+        )
+    if function.arity != arity:
+        raise RuntimeException(
+            None, f"Expected {function.arity} arguments but got {arity}"
+        )
+    return str(path.resolve()), function.name
+
+
+def _send(arguments: t.List[t.Any]) -> t.List[t.Any]:
+    try:
+        return [_encode(arg) for arg in arguments]
+    except ValueError:
+        raise RuntimeException(None, "Arguments can't be sent to a worker.")
+
+
+class ParallelMap(Callable):
+    """
+    Calls the function with every element of the list in the worker processes and
+    returns the results in the same order. A worker that hasn't loaded the script
+    yet runs its imports first, see the module docstring.
+    """
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        function, values = arguments
+        if not isinstance(values, LoxList):
+            raise RuntimeException(None, "Second argument must be a list.")
+        script, name = _target(function, 1)
+        calls = [_send([value]) for value in values]
+        if not calls:
+            return LoxList([])
+        python_modules = interpreter.python.allowed_modules
+        pool = _workers()
+        # A few chunks per worker, so each task is worth sending but the workers
+        # still get an even share
+        size = math.ceil(len(calls) / ((os.cpu_count() or 1) * 4))
+        futures = [
+            pool.submit(_run_calls, script, python_modules, name, calls[i : i + size])
+            for i in range(0, len(calls), size)
+        ]
+        results = []
+        for future in futures:
+            results.extend(_result(outcome) for outcome in _outcomes(future))
+        return LoxList(results)
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class LoxTask:
+    """
+    A call running in a worker, what `spawn` returns. Its result is got with
+    `wait`, or with `await` in async code.
+    """
+
+    def __init__(self, future: "Future[t.List[_Outcome]]", name: str):
+        self._future = future
+        self._name = name
+
+    def result(self) -> t.Any:
+        (outcome,) = _outcomes(self._future)
+        return _result(outcome)
+
+    def __await__(self):
+        return self._result().__await__()
+
+    async def _result(self) -> t.Any:
+        import asyncio
+
+        # `wait` doesn't raise, the error is raised by `result`
+        await asyncio.wait([asyncio.wrap_future(self._future)])
+        return self.result()
+
+    def __str__(self):
+        return f"<task {self._name}>"
+
+
+class Spawn(Callable):
+    """
+    `spawn(function, arguments...)` starts calling the function in a worker process.
+    A worker that hasn't loaded the script yet runs its imports first, see the
+    module docstring.
+    """
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        if not arguments:
+            raise RuntimeException(None, "Expected a function to spawn.")
+        script, name = _target(arguments[0], len(arguments) - 1)
+        future = _workers().submit(
+            _run_calls,
+            script,
+            interpreter.python.allowed_modules,
+            name,
+            [_send(arguments[1:])],
+        )
+        return LoxTask(future, name)
+
+    @property
+    def arity(self) -> t.Optional[int]:
+        return None
+
+
+class Wait(Callable):
+    """
+    Waits for a task started by `spawn` and returns its result. (`join` is already
+    the native that joins strings.)
+    """
+
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        task = arguments[0]
+        if not isinstance(task, LoxTask):
+            raise RuntimeException(None, "Argument must be a task.")
+        return task.result()
+
+    @property
+    def arity(self) -> int:
+        return 1
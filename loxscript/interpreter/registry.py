@@ -0,0 +1,222 @@
+import importlib
+import typing as t
+from pathlib import Path
+
+from ..lexer.token import Token
+from .callable import Callable
+from .environment import Environment
+
+# Python packages could ship their own natives by declaring entry points in this
+# group, e.g. in `pyproject.toml`:
+#
+#   [tool.poetry.plugins."loxscript.natives"]
+#   sqrt = "my_package.natives:Sqrt"
+#
+# The target is either a `Callable` subclass, which is created without arguments,
+# or a function which is given the interpreter and returns the value of the global.
+ENTRY_POINT_GROUP = "loxscript.natives"
+
+# Every area is a module of its own, so using one native doesn't import them all
+_NATIVES = "loxscript.interpreter.natives"
+_IO_NATIVES = "loxscript.interpreter.io_natives"
+_STRING_NATIVES = "loxscript.interpreter.string_natives"
+_ARRAY_NATIVES = "loxscript.interpreter.array_natives"
+_BUFFER_NATIVES = "loxscript.interpreter.buffer_natives"
+_ASYNC_NATIVES = "loxscript.interpreter.async_natives"
+_PARALLEL = "loxscript.interpreter.parallel"
+BUILTIN_NATIVES: t.Dict[str, str] = {
+    "clock": f"{_NATIVES}:Clock",
+    "getc": f"{_IO_NATIVES}:GetChar",
+    "readLine": f"{_IO_NATIVES}:ReadLine",
+    "readAll": f"{_IO_NATIVES}:ReadAll",
+    "chr": f"{_NATIVES}:Chr",
+    "print_error": f"{_NATIVES}:PrintError",
+    "exit": f"{_NATIVES}:Exit",
+    "len": f"{_NATIVES}:Len",
+    "push": f"{_NATIVES}:Push",
+    "pop": f"{_NATIVES}:Pop",
+    "slice": f"{_NATIVES}:Slice",
+    "has": f"{_NATIVES}:Has",
+    "delete": f"{_NATIVES}:Delete",
+    "keys": f"{_NATIVES}:Keys",
+    "array": f"{_ARRAY_NATIVES}:Array",
+    "sum": f"{_ARRAY_NATIVES}:Sum",
+    "min": f"{_ARRAY_NATIVES}:Min",
+    "max": f"{_ARRAY_NATIVES}:Max",
+    "map_add": f"{_ARRAY_NATIVES}:MapAdd",
+    "scale": f"{_ARRAY_NATIVES}:Scale",
+    "dot": f"{_ARRAY_NATIVES}:Dot",
+    "sort": f"{_NATIVES}:Sort",
+    "buffer": f"{_BUFFER_NATIVES}:Buffer",
+    "readInt": f"{_BUFFER_NATIVES}:ReadInt",
+    "readUint": f"{_BUFFER_NATIVES}:ReadUint",
+    "readFloat": f"{_BUFFER_NATIVES}:ReadFloat",
+    "writeInt": f"{_BUFFER_NATIVES}:WriteInt",
+    "writeFloat": f"{_BUFFER_NATIVES}:WriteFloat",
+    "decode": f"{_BUFFER_NATIVES}:Decode",
+    "open": f"{_IO_NATIVES}:Open",
+    "nextLine": f"{_IO_NATIVES}:NextLine",
+    "write": f"{_IO_NATIVES}:Write",
+    "close": f"{_IO_NATIVES}:Close",
+    "readFile": f"{_IO_NATIVES}:ReadFile",
+    "readBytes": f"{_IO_NATIVES}:ReadBytes",
+    "writeFile": f"{_IO_NATIVES}:WriteFile",
+    "substr": f"{_STRING_NATIVES}:Substr",
+    "find": f"{_STRING_NATIVES}:Find",
+    "split": f"{_STRING_NATIVES}:Split",
+    "join": f"{_STRING_NATIVES}:Join",
+    "replace": f"{_STRING_NATIVES}:Replace",
+    "ord": f"{_STRING_NATIVES}:Ord",
+    "toNumber": f"{_STRING_NATIVES}:ToNumber",
+    "toString": f"{_STRING_NATIVES}:ToString",
+    "upper": f"{_STRING_NATIVES}:Upper",
+    "lower": f"{_STRING_NATIVES}:Lower",
+    "trim": f"{_STRING_NATIVES}:Trim",
+    "range": f"{_NATIVES}:Range",
+    "pyimport": f"{_NATIVES}:PyImport",
+    "sleep": f"{_ASYNC_NATIVES}:Sleep",
+    "readFileAsync": f"{_ASYNC_NATIVES}:ReadFileAsync",
+    "unixRequest": f"{_ASYNC_NATIVES}:UnixRequest",
+    "gather": f"{_ASYNC_NATIVES}:Gather",
+    "parallelMap": f"{_PARALLEL}:ParallelMap",
+    "spawn": f"{_PARALLEL}:Spawn",
+    "wait": f"{_PARALLEL}:Wait",
+}
+
+Target = t.Union[str, t.Callable[[t.Any], t.Any]]
+
+
+def _entry_points(group: str) -> t.Iterable[t.Any]:
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=group)
+    # Before python 3.10 entry points were grouped in a dict
+    return entry_points.get(group, ())
+
+
+def _resolve(target: Target) -> t.Any:
+    if not isinstance(target, str):
+        return target
+    module, _, attribute = target.partition(":")
+    value = importlib.import_module(module)
+    for part in attribute.split("."):
+        value = getattr(value, part)
+    return value
+
+
+class NativeRegistry:
+    """
+    Knows where each native lives without loading any of them. A native is only
+    imported and created when a script first refers to its name.
+    """
+
+    def __init__(self, natives: t.Optional[t.Dict[str, Target]] = None):
+        self._natives = dict(BUILTIN_NATIVES if natives is None else natives)
+        # Natives registered from python code with `register`, they take precedence
+        # over the entry points of installed packages.
+        self._registered: t.Dict[str, Target] = {}
+        # Scanning installed packages isn't free either, so it is put off until a
+        # name that isn't a builtin is looked up.
+        self._scanned = False
+
+    def register(self, name: str, target: Target) -> None:
+        """
+        Makes `target` available to scripts as the global `name`. `target` is a
+        "module:attribute" string, so nothing is imported until a script uses it,
+        or the object itself.
+        """
+        self._registered[name] = target
+
+    def _scan(self) -> None:
+        self._scanned = True
+        for entry_point in _entry_points(ENTRY_POINT_GROUP):
+            self._natives.setdefault(entry_point.name, entry_point.value)
+
+    def _target(self, name: str) -> t.Optional[Target]:
+        if name in self._registered:
+            return self._registered[name]
+        if name not in self._natives and not self._scanned:
+            self._scan()
+        return self._natives.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return self._target(name) is not None
+
+    def load(self, name: str, interpreter) -> t.Any:
+        factory = _resolve(self._target(name))
+        if isinstance(factory, type) and issubclass(factory, Callable):
+            return factory()
+        return factory(interpreter)
+
+
+class GlobalEnvironment(Environment):
+    """
+    The outermost environment. Natives are only defined in it the first time they
+    are referred to, so scripts don't pay for the ones they don't use.
+    """
+
+    def __init__(
+        self,
+        interpreter,
+        natives: NativeRegistry,
+        directory: Path = Path(),
+        path: t.Optional[Path] = None,
+    ):
+        super().__init__()
+        self._interpreter = interpreter
+        self._natives = natives
+        # Modules are imported relative to this directory
+        self.directory = directory
+        # The file of the script or module, if it was run from one
+        self.path = path
+        # Globals that hold a native that wasn't replaced by the script
+        self._native_names: t.Set[str] = set()
+
+    def defines(self, name: str) -> bool:
+        return name in self._variables
+
+    def _load_native(self, name: str) -> bool:
+        if name in self._variables or name not in self._natives:
+            return False
+        self._variables[name] = self._natives.load(name, self._interpreter)
+        self._native_names.add(name)
+        return True
+
+    def load_natives(self) -> None:
+        """
+        Loads every builtin native now instead of when it's first used.
+        """
+        for name in BUILTIN_NATIVES:
+            self._load_native(name)
+
+    def define(self, name: str, value: t.Any):
+        self._native_names.discard(name)
+        super().define(name, value)
+
+    def variables(self) -> t.Dict[str, t.Any]:
+        """
+        The globals defined by the script, without the natives.
+        """
+        return {
+            name: value
+            for name, value in self._variables.items()
+            if name not in self._native_names
+        }
+
+    def get(self, name: Token):
+        try:
+            return self._variables[name.lexeme]
+        except KeyError:
+            if self._load_native(name.lexeme):
+                return self._variables[name.lexeme]
+            return super().get(name)
+
+    def assign(self, name: Token, value: t.Any):
+        if name.lexeme not in self._variables and name.lexeme in self._natives:
+            # No need to load a native that is overwritten straight away
+            self._variables[name.lexeme] = value
+            return
+        self._native_names.discard(name.lexeme)
+        return super().assign(name, value)
@@ -3,11 +3,13 @@ from contextlib import ExitStack, contextmanager
 from enum import Enum, auto
 from functools import singledispatchmethod
 
-from ..handle_errors import parse_error
+from ..handle_errors import ErrorReporter
 from ..lexer.token import Token
 from ..parser import expr as e
 from ..parser import stmt as stmt  # to prevent shadowing stmt parameter
-from .interpreter import Interpreter
+
+if t.TYPE_CHECKING:
+    from .interpreter import Interpreter
 
 
 class FunctionType(Enum):
@@ -15,6 +17,8 @@ class FunctionType(Enum):
     NONE = auto()
     METHOD = auto()
     INITIALIZER = auto()
+    GENERATOR = auto()
+    ASYNC = auto()
 
 
 class ClassType(Enum):
@@ -26,9 +30,13 @@ class ClassType(Enum):
 class Resolver(e.BaseVisitor, stmt.StmtVisitor):
     def visit_super_expr(self, super_expr: e.Super):
         if self._current_class is ClassType.NONE:
-            parse_error(super_expr.keyword, "Cannot use 'super' outside a class.")
+            self._errors.parse_error(
+                super_expr.keyword, "Cannot use 'super' outside a class."
+            )
         if self._current_class is ClassType.CLASS:
-            parse_error(super_expr.keyword, "Cannot use 'super' with no subclass.")
+            self._errors.parse_error(
+                super_expr.keyword, "Cannot use 'super' with no subclass."
+            )
         self._resolve_local(super_expr, super_expr.keyword)
 
     def visit_set_expr(self, set_expr: e.Set):
@@ -41,6 +49,24 @@ class Resolver(e.BaseVisitor, stmt.StmtVisitor):
     def visit_get_expr(self, get_expr: e.Get):
         self.resolve(get_expr.object)
 
+    def visit_list_expr(self, list_expr: e.ListLiteral):
+        for element in list_expr.elements:
+            self.resolve(element)
+
+    def visit_map_expr(self, map_expr: e.MapLiteral):
+        for key, value in map_expr.entries:
+            self.resolve(key)
+            self.resolve(value)
+
+    def visit_index_expr(self, index_expr: e.Index):
+        self.resolve(index_expr.object)
+        self.resolve(index_expr.index)
+
+    def visit_index_set_expr(self, index_set: e.IndexSet):
+        self.resolve(index_set.value)
+        self.resolve(index_set.object)
+        self.resolve(index_set.index)
+
     def visit_class_statement(self, class_stmt):
         enclosing_class = self._current_class
         self._current_class = ClassType.CLASS
@@ -50,7 +76,9 @@ class Resolver(e.BaseVisitor, stmt.StmtVisitor):
         if (class_stmt.superclass is not None) and (
             class_stmt.name.lexeme == class_stmt.superclass.name.lexeme
         ):
-            parse_error(class_stmt.name, "A class cannot inherit from itself.")
+            self._errors.parse_error(
+                class_stmt.name, "A class cannot inherit from itself."
+            )
 
         with ExitStack() as stack:
             if class_stmt.superclass is not None:
@@ -71,8 +99,9 @@ class Resolver(e.BaseVisitor, stmt.StmtVisitor):
 
         self._current_class = enclosing_class
 
-    def __init__(self, interpreter: Interpreter):
+    def __init__(self, interpreter: "Interpreter", errors: ErrorReporter):
         self._interpreter = interpreter
+        self._errors = errors
         self._scopes: t.List[t.Dict[str, bool]] = []
         self._current_function: FunctionType = FunctionType.NONE
         self._current_class: ClassType = ClassType.NONE
@@ -91,7 +120,7 @@ class Resolver(e.BaseVisitor, stmt.StmtVisitor):
             return
         scope = self._scopes[-1]
         if name.lexeme in scope.keys():
-            parse_error(name, f"{name.lexeme} already exists.")
+            self._errors.parse_error(name, f"{name.lexeme} already exists.")
         scope[name.lexeme] = False
 
     def _define(self, name: Token):
@@ -151,18 +180,57 @@ class Resolver(e.BaseVisitor, stmt.StmtVisitor):
 
     def visit_return_statement(self, return_stmt: stmt.Return):
         if self._current_function == FunctionType.NONE:
-            parse_error(
+            self._errors.parse_error(
                 return_stmt.keyword, "Cannot use return outside of functions or methods"
             )
         if (return_stmt.value is not None) and (
             self._current_function == FunctionType.INITIALIZER
         ):  # we still allow empty returns in initializers `return;`
-            parse_error(
+            self._errors.parse_error(
                 return_stmt.keyword, "Cannot return a value from an initializer"
             )
+        if (return_stmt.value is not None) and (
+            self._current_function == FunctionType.GENERATOR
+        ):  # generators end with `return;`, the values come from `yield`
+            self._errors.parse_error(
+                return_stmt.keyword, "Cannot return a value from a generator"
+            )
         if return_stmt.value is not None:
             self.resolve(return_stmt.value)
 
+    def visit_yield_statement(self, yield_stmt: stmt.Yield):
+        # The parser has already made the enclosing function a generator
+        if self._current_function == FunctionType.NONE:
+            self._errors.parse_error(
+                yield_stmt.keyword, "Cannot use yield outside of functions"
+            )
+        if yield_stmt.value is not None:
+            self.resolve(yield_stmt.value)
+
+    def visit_await_statement(self, await_stmt: stmt.Await):
+        # `await` at the top level waits on the event loop until it's done
+        if self._current_function not in (FunctionType.NONE, FunctionType.ASYNC):
+            self._errors.parse_error(
+                await_stmt.keyword, "Cannot use await outside of async functions"
+            )
+        if await_stmt.name is not None:
+            self._declare(await_stmt.name)
+        self.resolve(await_stmt.value)
+        if await_stmt.name is not None:
+            self._define(await_stmt.name)
+
+    def visit_for_in_statement(self, for_in: stmt.ForIn):
+        # The iterable can't see the loop variable
+        self.resolve(for_in.iterable)
+        with self._new_scope():
+            self._declare(for_in.name)
+            self._define(for_in.name)
+            self.resolve(for_in.body)
+
+    def visit_import_statement(self, import_stmt: stmt.Import):
+        self._declare(import_stmt.name)
+        self._define(import_stmt.name)
+
     def visit_expression_statement(self, expr_stmt: stmt.Expression):
         self.resolve(expr_stmt.expression)
 
@@ -192,7 +260,7 @@ class Resolver(e.BaseVisitor, stmt.StmtVisitor):
         Even function, method or classes are just variable that are callable.
         """
         if len(self._scopes) != 0 and (self._scopes[-1].get(var.name.lexeme) is False):
-            parse_error(
+            self._errors.parse_error(
                 var.name, "Can't read the local variable in it's own initializer"
             )
         self._resolve_local(var, var.name)
@@ -231,6 +299,22 @@ class Resolver(e.BaseVisitor, stmt.StmtVisitor):
 
     def _resolve_function(self, function: stmt.Function, type_: FunctionType):
         enclosing_func = self._current_function
+        if function.is_generator:
+            if function.name.lexeme == "init" and type_ is FunctionType.METHOD:
+                self._errors.parse_error(
+                    function.name, "An initializer cannot be a generator"
+                )
+            type_ = FunctionType.GENERATOR
+        if function.is_async:
+            if function.name.lexeme == "init" and type_ is FunctionType.METHOD:
+                self._errors.parse_error(
+                    function.name, "An initializer cannot be async"
+                )
+            if function.is_generator:
+                self._errors.parse_error(
+                    function.name, "An async function cannot be a generator"
+                )
+            type_ = FunctionType.ASYNC
         self._current_function = type_
         with self._new_scope():
             for param in function.params:
@@ -241,7 +325,9 @@ class Resolver(e.BaseVisitor, stmt.StmtVisitor):
 
     def visit_this_expr(self, this_expr: e.This):
         if self._current_class == ClassType.NONE:
-            parse_error(this_expr.keyword, "Cannot use 'this' outside of a class")
+            self._errors.parse_error(
+                this_expr.keyword, "Cannot use 'this' outside of a class"
+            )
             return
 
         self._resolve_local(this_expr, this_expr.keyword)
@@ -0,0 +1,137 @@
+"""
+String natives.
+"""
+
+import re
+import typing as t
+
+from ..errors import RuntimeException
+from .callable import Callable
+from .lox_list import LoxList, to_bounds
+from .natives import _string
+
+# A number literal, which could be negated
+_NUMBER = re.compile(r"-?[0-9]+(\.[0-9]+)?")
+
+
+class Substr(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        string, start, end = _string(arguments[0]), arguments[1], arguments[2]
+        start, end = to_bounds(None, start, end, len(string))
+        return string[start:end]
+
+    @property
+    def arity(self) -> int:
+        return 3
+
+
+class Find(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # Index of the first occurrence or -1
+        return float(_string(arguments[0]).find(_string(arguments[1])))
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Split(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        string, separator = _string(arguments[0]), _string(arguments[1])
+        if not separator:
+            # An empty separator splits into characters
+            return LoxList(list(string))
+        return LoxList(string.split(separator))
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Join(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        list_, separator = arguments[0], _string(arguments[1])
+        if not isinstance(list_, LoxList):
+            raise RuntimeException(None, "Can only join a list.")
+        return separator.join(
+            element if isinstance(element, str) else interpreter.stringify(element)
+            for element in list_.elements
+        )
+
+    @property
+    def arity(self) -> int:
+        return 2
+
+
+class Replace(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        string, old, new = (_string(argument) for argument in arguments)
+        return string.replace(old, new)
+
+    @property
+    def arity(self) -> int:
+        return 3
+
+
+class Ord(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        string = _string(arguments[0])
+        if len(string) != 1:
+            raise RuntimeException(None, "Argument must be a single character.")
+        return float(ord(string))
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class ToNumber(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # `nil` if the string isn't a number as it's written in lox, python would
+        # also take e.g. "nan", "1e5" and "1_000"
+        string = _string(arguments[0])
+        if _NUMBER.fullmatch(string) is None:
+            return None
+        return float(string)
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class ToString(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # Same text `print` shows
+        return interpreter.stringify(arguments[0])
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Upper(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        return _string(arguments[0]).upper()
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Lower(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        return _string(arguments[0]).lower()
+
+    @property
+    def arity(self) -> int:
+        return 1
+
+
+class Trim(Callable):
+    def call(self, interpreter, arguments: t.List[t.Any]) -> t.Any:
+        # Strips whitespace from both ends
+        return _string(arguments[0]).strip()
+
+    @property
+    def arity(self) -> int:
+        return 1
@@ -1,14 +1,15 @@
 import typing as t
 
-from loxscript.handle_errors import error
+from loxscript.handle_errors import ErrorReporter
 from loxscript.lexer.token import Token
 from loxscript.lexer.token_type import TokenType as tt
 
 
 class Scanner:
-    def __init__(self, source: str):
+    def __init__(self, source: str, errors: ErrorReporter):
         self._tokens = []
         self._source = source
+        self._errors = errors
         # The start field points to the first character
         # in the lexeme being scanned
         self._start = 0
@@ -40,7 +41,7 @@ class Scanner:
                 self._line += 1
             self._advance()
         if self._is_at_end():
-            error(self._line, "Unterminated string")
+            self._errors.error(self._line, "Unterminated string")
             return
 
         # Closing " or '
@@ -82,6 +83,12 @@ class Scanner:
             tt.OR,
             tt.NIL,
             tt.THIS,
+            tt.IN,
+            tt.YIELD,
+            tt.IMPORT,
+            tt.AS,
+            tt.ASYNC,
+            tt.AWAIT,
         ]
         while self._peek().isalnum() or self._peek() == "_":
             self._advance()
@@ -109,7 +116,10 @@ class Scanner:
             tt.RIGHT_PAREN,
             tt.LEFT_BRACE,
             tt.RIGHT_BRACE,
+            tt.LEFT_BRACKET,
+            tt.RIGHT_BRACKET,
             tt.COMMA,
+            tt.COLON,
             tt.DOT,
             tt.MINUS,
             tt.PLUS,
@@ -142,7 +152,7 @@ class Scanner:
         elif char.isalnum() or char == "_":
             self._handle_identifiers()
         else:
-            error(self._line, f"Illegal character {char}")
+            self._errors.error(self._line, f"Illegal character {char}")
 
     def get_tokens(self):
         while not self._is_at_end():
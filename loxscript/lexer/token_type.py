@@ -7,7 +7,10 @@ class TokenType(Enum):
     RIGHT_PAREN = "}"
     LEFT_BRACE = "("
     RIGHT_BRACE = ")"
+    LEFT_BRACKET = "["
+    RIGHT_BRACKET = "]"
     COMMA = ","
+    COLON = ":"
     DOT = "."
     MINUS = "-"
     PLUS = "+"
@@ -43,6 +46,12 @@ class TokenType(Enum):
     TRUE = "true"
     FALSE = "false"
     NIL = "nil"
+    IN = "in"
+    YIELD = "yield"
+    IMPORT = "import"
+    AS = "as"
+    ASYNC = "async"
+    AWAIT = "await"
 
     EOF = None
     THIS = "this"
@@ -53,6 +53,22 @@ class BaseVisitor(ABC):
     def visit_super_expr(self, super_expr: "Super"):
         pass
 
+    @abstractmethod
+    def visit_list_expr(self, list_expr: "ListLiteral"):
+        pass
+
+    @abstractmethod
+    def visit_map_expr(self, map_expr: "MapLiteral"):
+        pass
+
+    @abstractmethod
+    def visit_index_expr(self, index_expr: "Index"):
+        pass
+
+    @abstractmethod
+    def visit_index_set_expr(self, index_set: "IndexSet"):
+        pass
+
 
 class Expr(ABC):
     """
@@ -184,3 +200,45 @@ class Super(Expr):
 
     def accept(self, visitor: BaseVisitor) -> t.Any:
         return visitor.visit_super_expr(self)
+
+
+class ListLiteral(Expr):
+    def accept(self, visitor: BaseVisitor) -> t.Any:
+        return visitor.visit_list_expr(self)
+
+    def __init__(self, bracket: Token, elements: t.List[Expr]):
+        self.bracket = bracket
+        self.elements = elements
+
+
+class MapLiteral(Expr):
+    def accept(self, visitor: BaseVisitor) -> t.Any:
+        return visitor.visit_map_expr(self)
+
+    def __init__(self, bracket: Token, entries: t.List[t.Tuple[Expr, Expr]]):
+        # `entries` are the `(key, value)` pairs in the order they were written
+        self.bracket = bracket
+        self.entries = entries
+
+
+class Index(Expr):
+    def accept(self, visitor: BaseVisitor) -> t.Any:
+        return visitor.visit_index_expr(self)
+
+    def __init__(self, object_: Expr, bracket: Token, index: Expr):
+        # `bracket` is the closing `]`, it is used to report errors
+        self.object = object_
+        self.bracket = bracket
+        self.index = index
+
+
+class IndexSet(Expr):
+    def accept(self, visitor: BaseVisitor) -> t.Any:
+        return visitor.visit_index_set_expr(self)
+
+    def __init__(self, object_: Expr, bracket: Token, index: Expr, value: Expr):
+        # ex in `a.b[c] = d`, `a.b` is the object and `c` is the index
+        self.object = object_
+        self.bracket = bracket
+        self.index = index
+        self.value = value
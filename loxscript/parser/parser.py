@@ -1,17 +1,38 @@
+import functools
 import typing as t
+from pathlib import PurePath
 
 from ..errors import ParseError
-from ..handle_errors import parse_error
+from ..handle_errors import ErrorReporter
 from ..lexer.token import Token
 from ..lexer.token_type import TokenType as tt
 from . import expr as e
 from . import stmt
 
 
+def _keeps_line(parse: t.Callable[["Parser"], t.Any]) -> t.Callable[["Parser"], t.Any]:
+    # Statements don't keep a token of their own, so the line they start at is kept
+    # for the errors and the hooks of the interpreter
+    @functools.wraps(parse)
+    def parse_statement(self: "Parser") -> t.Any:
+        line = self._peek().line
+        statement = parse(self)
+        if statement is not None and not statement.line:
+            statement.line = line
+        return statement
+
+    return parse_statement
+
+
 class Parser:
-    def __init__(self, tokens: t.List[Token]):
+    def __init__(self, tokens: t.List[Token], errors: ErrorReporter):
         self._tokens = tokens
+        self._errors = errors
         self._current = 0
+        # Set when a `yield` is parsed, it makes the enclosing function a generator
+        self._found_yield = False
+        # Number of functions and methods parsed so far
+        self._function_count = 0
 
     def _match(self, *types: tt) -> bool:
         # If `Token` have any of the given types, it consumes the `Token`
@@ -42,8 +63,8 @@ class Parser:
     def _previous(self):
         return self._tokens[self._current - 1]
 
-    def _peek(self):
-        return self._tokens[self._current]
+    def _peek(self, distance: int = 0):
+        return self._tokens[min(self._current + distance, len(self._tokens) - 1)]
 
     def _is_at_end(self):
         return self._peek().type == tt.EOF
@@ -112,6 +133,10 @@ class Parser:
             elif self._match(tt.DOT):
                 name = self._consume(tt.IDENTIFIER, "Expected property name after '.'")
                 expr = e.Get(expr, name)
+            elif self._match(tt.LEFT_BRACKET):
+                index = self._expression()
+                bracket = self._consume(tt.RIGHT_BRACKET, "Expected ']' after index")
+                expr = e.Index(expr, bracket, index)
             else:
                 break
         return expr
@@ -149,6 +174,8 @@ class Parser:
             expr = self._expression()
             self._consume(tt.RIGHT_BRACE, "Expected ')' after expression")
             return e.Grouping(expression=expr)
+        if self._match(tt.LEFT_BRACKET):
+            return self._list_or_map_literal()
         if self._match(tt.IDENTIFIER):
             return e.Variable(self._previous())
         if self._match(tt.THIS):
@@ -160,6 +187,36 @@ class Parser:
             return e.Super(keyword, method)
         raise self._error(self._peek(), "Expected expression.")
 
+    def _list_or_map_literal(self):
+        """
+        list ::= "[" ( expression ( "," expression )* )? "]" ;
+        map  ::= "[" ":" "]" | "[" entry ( "," entry )* "]" ;
+        entry ::= expression ":" expression ;
+        """
+        # `[` is already consumed
+        if self._match(tt.COLON):
+            bracket = self._consume(tt.RIGHT_BRACKET, "Expected ']' after '[:'")
+            return e.MapLiteral(bracket=bracket, entries=[])
+        if self._check(tt.RIGHT_BRACKET):
+            return e.ListLiteral(bracket=self._advance(), elements=[])
+
+        first = self._expression()
+        if self._match(tt.COLON):
+            # The first key decides that it's a map
+            entries = [(first, self._expression())]
+            while self._match(tt.COMMA):
+                key = self._expression()
+                self._consume(tt.COLON, "Expected ':' after map key")
+                entries.append((key, self._expression()))
+            bracket = self._consume(tt.RIGHT_BRACKET, "Expected ']' after map entries")
+            return e.MapLiteral(bracket=bracket, entries=entries)
+
+        elements = [first]
+        while self._match(tt.COMMA):
+            elements.append(self._expression())
+        bracket = self._consume(tt.RIGHT_BRACKET, "Expected ']' after list elements")
+        return e.ListLiteral(bracket=bracket, elements=elements)
+
     def _consume(self, type_: tt, message: str):
         """
         It's similar to match. If the token is of given type it consumes it.
@@ -170,9 +227,8 @@ class Parser:
             return self._previous()
         raise self._error(self._peek(), message)
 
-    @staticmethod
-    def _error(token: Token, message: str) -> ParseError:
-        parse_error(token, message)
+    def _error(self, token: Token, message: str) -> ParseError:
+        self._errors.parse_error(token, message)
         return ParseError()
 
     def _synchronize(self):
@@ -193,6 +249,9 @@ class Parser:
                 tt.WHILE,
                 tt.PRINT,
                 tt.RETURN,
+                tt.IMPORT,
+                tt.ASYNC,
+                tt.AWAIT,
             ):
                 return
 
@@ -208,6 +267,7 @@ class Parser:
         self._consume(tt.SEMICOLON, "Expected ';' after expression")
         return stmt.Expression(expression=value)
 
+    @_keeps_line
     def _statement(self):
         if self._match(tt.PRINT):
             return self._print_statement()
@@ -221,9 +281,14 @@ class Parser:
             return self._for_statement()
         if self._match(tt.RETURN):
             return self._return_statement()
+        if self._match(tt.YIELD):
+            return self._yield_statement()
+        if self._match(tt.AWAIT):
+            return self._await_statement()
         return self._expression_statement()
 
-    def _function_declaration_statement(self, kind: str):
+    def _function_declaration_statement(self, kind: str, is_async: bool = False):
+        self._function_count += 1
         fname = self._consume(tt.IDENTIFIER, f"{kind} needs to have a name")
         self._consume(tt.LEFT_BRACE, "Expected '(' after fun keyword")
         parameters: t.List[Token] = []
@@ -239,8 +304,20 @@ class Parser:
         self._consume(
             tt.LEFT_PAREN, "Expected '{' before body."
         )  # `block` method assumes `{` is already consumed
+        # Only a `yield` directly in this function makes it a generator, not one in
+        # a nested function
+        enclosing_found_yield = self._found_yield
+        self._found_yield = False
         statements = self._block()
-        return stmt.Function(name=fname, params=parameters, body=statements)
+        is_generator = self._found_yield
+        self._found_yield = enclosing_found_yield
+        return stmt.Function(
+            name=fname,
+            params=parameters,
+            body=statements,
+            is_generator=is_generator,
+            is_async=is_async,
+        )
 
     def _while_statement(self):
         self._consume(tt.LEFT_BRACE, "Expect '(' after while")
@@ -259,6 +336,7 @@ class Parser:
 
         return statements
 
+    @_keeps_line
     def _declaration(self):
         try:
             if self._match(tt.VAR):
@@ -267,6 +345,13 @@ class Parser:
                 return self._class_declaration()
             if self._match(tt.FUNCTION):
                 return self._function_declaration_statement(kind="function")
+            if self._match(tt.ASYNC):
+                self._consume(tt.FUNCTION, "Expected 'fun' after 'async'")
+                return self._function_declaration_statement(
+                    kind="function", is_async=True
+                )
+            if self._match(tt.IMPORT):
+                return self._import_declaration()
 
             return self._statement()
         except ParseError:
@@ -280,6 +365,8 @@ class Parser:
         initializer = None
 
         if self._match(tt.EQUAL):
+            if self._match(tt.AWAIT):
+                return self._await_statement(name)
             # If EQUAL matches it have already consume `=` operator
             # initializer is the value of the variable here
             initializer = self._expression()
@@ -287,6 +374,23 @@ class Parser:
         self._consume(tt.SEMICOLON, "Expected ';' after variable declaration")
         return stmt.Var(name=name, initializer=initializer)
 
+    def _import_declaration(self):
+        """
+        import ::= "import" STRING ( "as" IDENTIFIER )? ";" ;
+        """
+        keyword = self._previous()
+        path = self._consume(tt.STRING, "Expected module path after 'import'")
+        if self._match(tt.AS):
+            name = self._consume(tt.IDENTIFIER, "Expected module name after 'as'")
+        else:
+            # `import "lib/strings.lox";` binds the module to `strings`
+            stem = PurePath(path.literal).stem
+            if not stem.isidentifier():
+                raise self._error(path, "Expected 'as' and a name for the module")
+            name = Token(tt.IDENTIFIER, stem, None, path.line)
+        self._consume(tt.SEMICOLON, "Expected ';' after import")
+        return stmt.Import(keyword=keyword, path=path, name=name)
+
     def _assignment(self) -> e.Expr:
         """
         assignment  :=  IDENTIFIER "=" assignment
@@ -305,6 +409,13 @@ class Parser:
                 return e.Assign(name=expr.name, value=rhs)
             elif isinstance(expr, e.Get):
                 return e.Set(object_=expr.object, name=expr.name, value=rhs)
+            elif isinstance(expr, e.Index):
+                return e.IndexSet(
+                    object_=expr.object,
+                    bracket=expr.bracket,
+                    index=expr.index,
+                    value=rhs,
+                )
             self._error(equals, "Invalid assignment target")
         return expr
 
@@ -355,6 +466,12 @@ class Parser:
 
     def _for_statement(self):
         self._consume(tt.LEFT_BRACE, "Expected '(' after for keyword")
+        if (
+            self._check(tt.VAR)
+            and self._peek(1).type == tt.IDENTIFIER
+            and self._peek(2).type == tt.IN
+        ):
+            return self._for_in_statement()
         initializer: t.Optional[stmt.Stmt] = None
 
         if self._match(tt.SEMICOLON):
@@ -390,6 +507,45 @@ class Parser:
 
         return body
 
+    def _for_in_statement(self):
+        """
+        for_in ::= "for" "(" "var" IDENTIFIER "in" expression ")" statement ;
+        """
+        self._consume(tt.VAR, "Expected 'var' in for-in loop")
+        name = self._consume(tt.IDENTIFIER, "Expected loop variable name")
+        keyword = self._consume(tt.IN, "Expected 'in' after loop variable")
+        iterable = self._expression()
+        self._consume(tt.RIGHT_BRACE, "Expect ')' after for-in clause.")
+        function_count = self._function_count
+        body = self._statement()
+        return stmt.ForIn(
+            name=name,
+            keyword=keyword,
+            iterable=iterable,
+            body=body,
+            has_closures=self._function_count != function_count,
+        )
+
+    def _yield_statement(self):
+        keyword = self._previous()
+        value = None
+        if not self._check(tt.SEMICOLON):
+            value = self._expression()
+        self._consume(tt.SEMICOLON, "Expected ';' after yield")
+        self._found_yield = True
+        return stmt.Yield(keyword=keyword, value=value)
+
+    def _await_statement(self, name: t.Optional[Token] = None):
+        """
+        await ::= ( "var" IDENTIFIER "=" )? "await" expression ";" ;
+        """
+        # `await` is a statement, like `yield`, so an async function can only be
+        # suspended between statements
+        keyword = self._previous()
+        value = self._expression()
+        self._consume(tt.SEMICOLON, "Expected ';' after await")
+        return stmt.Await(keyword=keyword, value=value, name=name)
+
     def _return_statement(self):
         keyword = self._previous()
         value = None
@@ -412,7 +568,10 @@ class Parser:
         methods: t.List[stmt.Function] = []
 
         while (not self._check(tt.RIGHT_PAREN)) and (not self._is_at_end()):
-            methods.append(self._function_declaration_statement(kind="method"))
+            is_async = self._match(tt.ASYNC)
+            methods.append(
+                self._function_declaration_statement(kind="method", is_async=is_async)
+            )
 
         self._consume(tt.RIGHT_PAREN, "Expected '}' after class body")
 
@@ -42,8 +42,27 @@ class StmtVisitor(ABC):
     def visit_class_statement(self, class_stmt: "Class"):
         pass
 
+    @abstractmethod
+    def visit_yield_statement(self, yield_stmt: "Yield"):
+        pass
+
+    @abstractmethod
+    def visit_for_in_statement(self, for_in: "ForIn"):
+        pass
+
+    @abstractmethod
+    def visit_import_statement(self, import_stmt: "Import"):
+        pass
+
+    @abstractmethod
+    def visit_await_statement(self, await_stmt: "Await"):
+        pass
+
 
 class Stmt:
+    # The line the statement starts at, set by the parser
+    line = 0
+
     @abstractmethod
     def accept(self, visitor: StmtVisitor):
         pass
@@ -105,10 +124,21 @@ class Function(Stmt):
     def accept(self, visitor: StmtVisitor) -> t.Any:
         return visitor.visit_function(self)
 
-    def __init__(self, name: Token, params: t.List[Token], body: t.List[Stmt]):
+    def __init__(
+        self,
+        name: Token,
+        params: t.List[Token],
+        body: t.List[Stmt],
+        is_generator: bool = False,
+        is_async: bool = False,
+    ):
         self.body = body
         self.params = params
         self.name = name
+        # Functions with `yield` in their body return a generator when called
+        self.is_generator = is_generator
+        # `async fun` functions return a coroutine when called
+        self.is_async = is_async
 
 
 class Return(Stmt):
@@ -130,3 +160,57 @@ class Class(Stmt):
         self.name = name
         self.methods = methods
         self.superclass = superclass
+
+
+class Yield(Stmt):
+    def accept(self, visitor: StmtVisitor):
+        visitor.visit_yield_statement(self)
+
+    def __init__(self, keyword: Token, value: t.Optional[e.Expr]):
+        self.keyword = keyword
+        self.value = value
+
+
+class ForIn(Stmt):
+    def accept(self, visitor: StmtVisitor):
+        visitor.visit_for_in_statement(self)
+
+    def __init__(
+        self,
+        name: Token,
+        keyword: Token,
+        iterable: e.Expr,
+        body: Stmt,
+        has_closures: bool = True,
+    ):
+        # `keyword` is the `in` token, it is used to report errors
+        self.name = name
+        self.keyword = keyword
+        self.iterable = iterable
+        self.body = body
+        # Whether functions or classes are declared in the body. Only then the
+        # iterations need a variable of their own.
+        self.has_closures = has_closures
+
+
+class Import(Stmt):
+    def accept(self, visitor: StmtVisitor):
+        visitor.visit_import_statement(self)
+
+    def __init__(self, keyword: Token, path: Token, name: Token):
+        # `path` is the string token, the module is bound to `name`
+        self.keyword = keyword
+        self.path = path
+        self.name = name
+
+
+class Await(Stmt):
+    def accept(self, visitor: StmtVisitor):
+        visitor.visit_await_statement(self)
+
+    def __init__(self, keyword: Token, value: e.Expr, name: t.Optional[Token] = None):
+        # `var name = await value;` declares `name` with the result, `await value;`
+        # just waits for it
+        self.keyword = keyword
+        self.value = value
+        self.name = name
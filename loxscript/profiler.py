@@ -0,0 +1,193 @@
+"""
+A sampling profiler for lox code. A thread looks at the python stack of the thread
+running the script every `interval` seconds and turns it into the lox call stack,
+so the script itself runs at full speed between samples.
+
+    with Profiler() as profiler:
+        app(source)
+    profiler.write_collapsed("profile.txt")  # for flamegraph.pl or speedscope
+    profiler.report(sys.stderr)
+"""
+
+import sys
+import threading
+import typing as t
+from collections import Counter
+
+from .interpreter.callable import Function
+from .interpreter.interpreter import Interpreter
+from .lexer.token import Token
+
+# The frames that start a new lox frame
+_CALL = Function.call.__code__
+_RESUME = Interpreter.resume.__code__
+_IMPORT = Interpreter._import.__code__
+
+
+class Frame(t.NamedTuple):
+    # `name` is like "fib (main.lox:3)", `line` is the line that was running in it
+    name: str
+    file: str
+    line: t.Optional[int]
+
+
+def _line(frame) -> t.Optional[int]:
+    # The syntax tree node a `visit_*` method was called with, its first token
+    # tells the line
+    code = frame.f_code
+    if code.co_argcount < 2 or not code.co_name.startswith("visit_"):
+        return None
+    node = frame.f_locals.get(code.co_varnames[1])
+    for value in getattr(node, "__dict__", {}).values():
+        if isinstance(value, Token):
+            return value.line
+    return None
+
+
+def _file(globals_) -> str:
+    path = globals_.path
+    return "<script>" if path is None else path.name
+
+
+class Profiler:
+    def __init__(self, interval: float = 0.005, script: str = "<script>"):
+        """
+        `script` is the name of the outermost frame. Samples are taken every
+        `interval` seconds, though never more often than python switches threads
+        (`sys.getswitchinterval()`) while the script is busy.
+        """
+        self.interval = interval
+        self.script = script
+        # How often each stack was seen, outermost frame first
+        self.stacks: t.Counter[t.Tuple[Frame, ...]] = Counter()
+        self._thread_id: t.Optional[int] = None
+        self._stopped = threading.Event()
+        self._sampler: t.Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Starts sampling the calling thread.
+        """
+        self._thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._sampler = threading.Thread(
+            target=self._run, name="loxscript-profiler", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        current_frames = sys._current_frames
+        while not self._stopped.wait(self.interval):
+            frame = current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[self._lox_stack(frame)] += 1
+            # Not kept alive until the next sample
+            del frame
+
+    def _lox_stack(self, frame) -> t.Tuple[Frame, ...]:
+        stack: t.List[Frame] = []
+        line = None
+        while frame is not None:
+            code = frame.f_code
+            if code is _CALL:
+                function = frame.f_locals["self"]
+                file = _file(function.globals)
+                name = f"{function.name} ({file}:{function.line})"
+                stack.append(Frame(name, file, line))
+                line = None
+            elif code is _RESUME:
+                # The body of a generator or a coroutine
+                generator = frame.f_locals["generator"]
+                stack.append(Frame(str(generator), _file(generator.globals), line))
+                line = None
+            elif code is _IMPORT:
+                path = frame.f_locals.get("path")
+                if path is not None:
+                    name = f"<module {path.name}>"
+                    stack.append(Frame(name, path.name, line))
+                    line = None
+            elif line is None:
+                line = _line(frame)
+            frame = frame.f_back
+        stack.append(Frame(self.script, self.script, line))
+        stack.reverse()
+        return tuple(stack)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def collapsed(self) -> t.List[str]:
+        """
+        The samples in the collapsed stack format of flamegraph tools, a line
+        `outer;inner count` for every stack.
+        """
+        collapsed: t.Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            # Flamegraphs show functions, the lines are only in the report
+            collapsed[
+                ";".join(frame.name.replace(";", ",") for frame in stack)
+            ] += count
+        return [f"{stack} {count}" for stack, count in sorted(collapsed.items())]
+
+    def write_collapsed(self, path: str):
+        with open(path, "w", encoding="utf-8") as file:
+            for line in self.collapsed():
+                file.write(line + "\n")
+
+    def functions(self) -> t.List[t.Tuple[str, int, int]]:
+        """
+        `(name, total samples, self samples)` for every frame name, the ones with
+        the most samples first. A recursive function counts once per sample.
+        """
+        total: t.Counter[str] = Counter()
+        self_: t.Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            for name in {frame.name for frame in stack}:
+                total[name] += count
+            self_[stack[-1].name] += count
+        return sorted(
+            ((name, total[name], self_[name]) for name in total),
+            key=lambda entry: (-entry[1], -entry[2], entry[0]),
+        )
+
+    def lines(self) -> t.List[t.Tuple[str, int]]:
+        """
+        `("file:line", self samples)` of the lines that were running, the ones with
+        the most samples first.
+        """
+        lines: t.Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frame = stack[-1]
+            if frame.line is not None:
+                lines[f"{frame.file}:{frame.line}"] += count
+        return lines.most_common()
+
+    def report(self, file: t.TextIO, limit: int = 20):
+        """
+        Writes the time spent in each function (`total` including what it called,
+        `self` only in its own code) and the lines the most time was spent on.
+        """
+        samples = self.samples
+        print(f"{samples} samples, one every {self.interval * 1000:g} ms", file=file)
+        if not samples:
+            return
+        print(f"{'total':>8} {'self':>8}  function", file=file)
+        for name, total, self_ in self.functions()[:limit]:
+            print(f"{total / samples:8.1%} {self_ / samples:8.1%}  {name}", file=file)
+        print(f"{'self':>8}  line", file=file)
+        for line, self_ in self.lines()[:limit]:
+            print(f"{self_ / samples:8.1%}  {line}", file=file)
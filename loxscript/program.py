@@ -0,0 +1,90 @@
+"""
+The embedding API, a script is compiled once and could then be run any number of
+times:
+
+    program = loxscript.compile(source)
+    for order in orders:
+        result = program.run(globals={"order": order})["discount"]
+"""
+
+import typing as t
+from pathlib import Path
+
+from .errors import ScriptError
+from .handle_errors import ErrorReporter
+from .interpreter.ffi import DEFAULT_PYTHON_MODULES
+from .interpreter.interpreter import Interpreter
+from .interpreter.modules import compile_source
+from .parser import expr as e
+from .parser import stmt
+
+
+class Program:
+    """
+    A compiled script. Running it never changes it, so the same program could be run
+    by many interpreters, also at the same time from different threads.
+    """
+
+    def __init__(
+        self,
+        statements: t.Sequence[stmt.Stmt],
+        locals_: t.Dict[e.Expr, int],
+        directory: Path = Path(),
+        path: t.Optional[Path] = None,
+    ):
+        self._statements = tuple(statements)
+        self._locals = locals_
+        self.directory = directory
+        # The file of the script, if it's compiled from one
+        self.path = path
+
+    def run(
+        self,
+        globals: t.Optional[t.Mapping[str, t.Any]] = None,
+        stdout: t.Optional[t.TextIO] = None,
+        python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES,
+    ) -> t.Dict[str, t.Any]:
+        """
+        Runs the program in a fresh interpreter. `globals` are defined before it
+        runs, converted to lox values like the values python code returns to lox.
+        `print` writes to `stdout`.
+
+        Returns the globals of the script converted back to python values, raises
+        `ScriptError` if there was a runtime error.
+        """
+        errors = ErrorReporter(echo=False)
+        interpreter = Interpreter(
+            python_modules, directory=self.directory, errors=errors, stdout=stdout
+        )
+        interpreter.share_locals(self._locals)
+        interpreter.globals.path = self.path
+        for name, value in (globals or {}).items():
+            interpreter.globals.define(name, interpreter.python.to_lox(value))
+        interpreter.interpret(self._statements)
+        if errors.has_any_error():
+            raise ScriptError(errors.diagnostics)
+        return {
+            name: interpreter.python.to_python(value)
+            for name, value in interpreter.globals.variables().items()
+        }
+
+
+def compile(
+    source: str,
+    directory: t.Union[str, Path] = Path(),
+    path: t.Optional[t.Union[str, Path]] = None,
+) -> Program:
+    """
+    Compiles `source`, modules it imports are looked up in `directory`. `path` is
+    the file the source is from, functions of a script file could run in worker
+    processes (`parallelMap`, `spawn`). Raises `ScriptError` if there are any
+    errors.
+    """
+    errors = ErrorReporter(echo=False)
+    compiled = compile_source(source, errors)
+    if compiled is None:
+        raise ScriptError(errors.diagnostics)
+    statements, locals_ = compiled
+    return Program(
+        statements, locals_, Path(directory), None if path is None else Path(path)
+    )
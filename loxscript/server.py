@@ -0,0 +1,422 @@
+"""
+`loxscript serve` keeps worker processes with loxscript imported waiting for
+scripts, which are sent over a Unix socket by `loxscript.client`. Compiled
+programs are cached in the workers, so a script that didn't change is only
+compiled once per worker. The protocol is described in `loxscript.client`.
+
+With `--fork` every script runs in a child forked from a prepared interpreter
+instead, see `ForkServer`.
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import Connection
+from contextlib import redirect_stderr, redirect_stdout, suppress
+from pathlib import Path
+
+from .client import check_owner, default_socket_path
+from .errors import RuntimeException, ScriptError
+from .handle_errors import ErrorReporter, exit_status
+from .interpreter.ffi import DEFAULT_PYTHON_MODULES
+from .interpreter.interpreter import Interpreter
+from .interpreter.modules import Compiled, compile_source
+from .program import Program, compile
+
+# Compiled programs kept by each worker, the least recently used are dropped first
+PROGRAM_CACHE_SIZE = 256
+# Seconds between checks that a worker running a script that prints nothing is
+# still alive
+_WORKER_CHECK_INTERVAL = 0.5
+
+_programs: t.Dict[t.Tuple[t.Any, ...], Program] = {}
+
+
+def _prewarm():
+    # Natives are loaded lazily, load them once per worker instead of in every job
+    import loxscript.interpreter.array_natives  # noqa: F401
+    import loxscript.interpreter.buffer_natives  # noqa: F401
+    import loxscript.interpreter.io_natives  # noqa: F401
+    import loxscript.interpreter.natives  # noqa: F401
+    import loxscript.interpreter.string_natives  # noqa: F401
+
+
+def _program(request: t.Dict[str, t.Any]) -> Program:
+    if "script" in request:
+        path = Path(request["script"])
+        stat = path.stat()
+        key: t.Tuple[t.Any, ...] = (str(path), stat.st_mtime_ns, stat.st_size)
+    else:
+        path = None
+        key = (request["source"], request.get("directory", ""))
+    program = _programs.pop(key, None)
+    if program is None:
+        if path is not None:
+            program = compile(path.read_text(), path.parent, path)
+        else:
+            program = compile(request["source"], request.get("directory", ""))
+        if len(_programs) >= PROGRAM_CACHE_SIZE:
+            del _programs[next(iter(_programs))]
+    # Moved to the end, dicts keep the insertion order
+    _programs[key] = program
+    return program
+
+
+class _MessageStream(io.TextIOBase):
+    """
+    Sends what is written to it as messages of `kind`, a line at a time, so the
+    client gets the output while the script is still running.
+    """
+
+    def __init__(self, send: t.Callable[[t.Dict[str, t.Any]], None], kind: str):
+        self._send = send
+        self._kind = kind
+        self._pending: t.List[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._pending.append(text)
+        if "\n" in text:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._pending:
+            self._send({self._kind: "".join(self._pending)})
+            self._pending.clear()
+
+
+class _Forwarder:
+    """
+    Sends the output messages of a script to `output` from a thread of its own, so
+    the script doesn't wait for every message to be sent. What the script writes
+    while a batch is being sent goes in the next batch.
+    """
+
+    def __init__(self, output: Connection):
+        self._output = output
+        self._pending: t.List[t.Dict[str, str]] = []
+        self._lock = threading.Lock()
+        self._written = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, message: t.Dict[str, str]):
+        with self._lock:
+            self._pending.append(message)
+        self._written.set()
+
+    def _send_pending(self):
+        with self._lock:
+            messages, self._pending = self._pending, []
+        if not messages:
+            return
+        # Consecutive messages of the same kind are joined
+        joined: t.List[t.Dict[str, str]] = []
+        for message in messages:
+            ((kind, text),) = message.items()
+            if joined and kind in joined[-1]:
+                joined[-1][kind] += text
+            else:
+                joined.append({kind: text})
+        self._output.send_bytes(
+            b"\n".join(json.dumps(message).encode() for message in joined)
+        )
+
+    def _run(self):
+        while not self._closed:
+            self._written.wait()
+            self._written.clear()
+            self._send_pending()
+
+    def close(self):
+        self._closed = True
+        self._written.set()
+        self._thread.join()
+        # What was put while the last batch was sent
+        self._send_pending()
+
+
+def run_request(
+    request: t.Dict[str, t.Any],
+    output: Connection,
+    python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES,
+) -> int:
+    """
+    Runs the script of `request` in this process and returns its exit code. The
+    output messages are sent to `output` while the script runs, as JSON lines, and
+    an empty message when it's done.
+    """
+    forwarder = _Forwarder(output)
+    stdout = _MessageStream(forwarder.put, "stdout")
+    stderr = _MessageStream(forwarder.put, "stderr")
+    sys.stdin = io.StringIO(request.get("stdin", ""))
+    # A worker runs one script at a time, so it can change its directory
+    cwd = os.getcwd()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            os.chdir(request.get("cwd", cwd))
+            _program(request).run(stdout=stdout, python_modules=python_modules)
+            code = 0
+        except ScriptError as err:
+            for diagnostic in err.diagnostics:
+                print(diagnostic, file=sys.stderr)
+            code = err.exit_code
+        except OSError as err:
+            print(f"Could not read '{err.filename}': {err.strerror}.", file=sys.stderr)
+            code = 1
+        except SystemExit as exit_:
+            code = exit_status(exit_.code)
+        except Exception:
+            # What python would print if the script was run on its own
+            traceback.print_exc()
+            code = 1
+        finally:
+            os.chdir(cwd)
+            stdout.flush()
+            stderr.flush()
+            forwarder.close()
+            output.send_bytes(b"")
+            output.close()
+    return code
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "Server"
+
+    def _send(self, message: t.Dict[str, t.Any]):
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._send({"stderr": "Invalid request.\n"})
+                self._send({"exit": 1})
+                continue
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            with reader, writer:
+                future = self.server.workers.submit(
+                    run_request, request, writer, self.server.python_modules
+                )
+                # The output is passed on while the script runs, until the worker
+                # says it's done. Waiting for more only times out if it died.
+                done = False
+                while not done:
+                    if not reader.poll(_WORKER_CHECK_INTERVAL):
+                        done = future.done()
+                        continue
+                    # What has arrived is sent to the client at once
+                    messages = []
+                    while not done and (not messages or reader.poll()):
+                        message = reader.recv_bytes()
+                        done = not message
+                        messages.append(message + b"\n")
+                    self.wfile.write(b"".join(messages[:-1] if done else messages))
+            try:
+                code = future.result()
+            except Exception as err:  # The worker died, the daemon keeps serving
+                self._send({"stderr": f"The script crashed: {err!r}\n"})
+                code = 1
+            self._send({"exit": code})
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: str,
+        workers: t.Optional[int] = None,
+        python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES,
+    ):
+        _prepare_socket(socket_path)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.python_modules = tuple(python_modules)
+        self.workers = ProcessPoolExecutor(workers, initializer=_prewarm)
+
+    def server_close(self):
+        super().server_close()
+        self.workers.shutdown()
+        with suppress(OSError):
+            os.unlink(self.socket_path)
+
+
+class _ForkHandler(_Handler):
+    server: "ForkServer"
+
+    def handle(self):
+        # Runs in a child forked for this request, anything it changes is lost when
+        # it exits
+        request = json.loads(self.rfile.readline())
+        interpreter = self.server.snapshot
+        sys.stdout = _MessageStream(self._send, "stdout")
+        sys.stderr = _MessageStream(self._send, "stderr")
+        sys.stdin = io.StringIO(request.get("stdin", ""))
+        errors = interpreter.errors = ErrorReporter()
+        try:
+            os.chdir(request.get("cwd", os.getcwd()))
+            compiled = self._compile(request, interpreter)
+            if compiled is not None:
+                statements, locals_ = compiled
+                interpreter.add_locals(locals_)
+                interpreter.interpret(statements)
+            code = errors.exit_code()
+        except OSError as err:
+            print(f"Could not read '{err.filename}': {err.strerror}.", file=sys.stderr)
+            code = 1
+        except SystemExit as exit_:
+            code = exit_status(exit_.code)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self._send({"exit": code})
+
+    @staticmethod
+    def _compile(
+        request: t.Dict[str, t.Any], interpreter: Interpreter
+    ) -> t.Optional[Compiled]:
+        if "script" in request:
+            path = Path(request["script"])
+            interpreter.globals.directory = path.parent
+            interpreter.globals.path = path
+            # Like `loxscript script.lox`, only imported modules are cached on disk,
+            # not leaving a cache next to every script that is run
+            return compile_source(path.read_text(), interpreter.errors)
+        interpreter.globals.directory = Path(request.get("directory", ""))
+        return compile_source(request["source"], interpreter.errors)
+
+
+class ForkServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """
+    Forks a child for every script from an interpreter that is set up once, with
+    the natives and the `preload` modules already loaded. Each script starts from a
+    copy-on-write copy of it, so jobs start instantly and still share nothing.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        python_modules: t.Iterable[str] = DEFAULT_PYTHON_MODULES,
+        preload: t.Iterable[str] = (),
+    ):
+        _prepare_socket(socket_path)
+        super().__init__(socket_path, _ForkHandler)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.snapshot = Interpreter(python_modules)
+        self.snapshot.globals.load_natives()
+        for path in preload:
+            self.snapshot.import_module(str(Path(path).resolve()))
+
+    def server_close(self):
+        super().server_close()
+        with suppress(OSError):
+            os.unlink(self.socket_path)
+
+
+def _prepare_socket(socket_path: str):
+    """
+    Makes sure the socket could be created only where other users can't get at
+    it, and removes a socket left behind by a daemon that is gone.
+    """
+    directory = os.path.dirname(socket_path) or "."
+    if not os.path.isdir(directory):
+        # The default directory in the temporary directory, only the user can
+        # access it
+        os.makedirs(directory, mode=0o700)
+    if directory == os.path.dirname(default_socket_path()):
+        # Someone else could have created it first
+        check_owner(directory)
+        if os.stat(directory).st_mode & 0o077:
+            raise OSError(f"'{directory}' can be accessed by other users.")
+    if not os.path.exists(socket_path):
+        return
+    check_owner(socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            # Left behind by a daemon that didn't shut down cleanly
+            os.unlink(socket_path)
+            return
+    raise OSError(f"A loxscript server is already listening on '{socket_path}'.")
+
+
+def _argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="loxscript serve",
+        description="Runs scripts sent by `loxscript client` in warm workers.",
+    )
+    parser.add_argument("--socket", default=None, help="socket to listen on")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes, one per core by default",
+    )
+    parser.add_argument(
+        "--allow-python",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="python module scripts may import with `pyimport`",
+    )
+    parser.add_argument(
+        "--fork",
+        action="store_true",
+        help="fork every script from a prepared interpreter instead of using "
+        "worker processes",
+    )
+    parser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="lox module to import once before forking, with --fork",
+    )
+    return parser
+
+
+def main(args: t.List[str]) -> int:
+    parser = _argument_parser()
+    options = parser.parse_args(args)
+    socket_path = options.socket or default_socket_path()
+    python_modules = (*DEFAULT_PYTHON_MODULES, *options.allow_python)
+    try:
+        if options.fork:
+            server = ForkServer(socket_path, python_modules, options.preload)
+        else:
+            server = Server(socket_path, options.workers, python_modules)
+    except OSError as err:
+        parser.error(str(err))
+    except RuntimeException as err:
+        parser.error(f"could not preload a module: {err}")
+    # Stopping the daemon with `kill` still removes the socket and the workers
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with server:
+        print(f"Listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
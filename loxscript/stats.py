@@ -0,0 +1,87 @@
+"""
+Execution counters: nodes evaluated by type, lox calls and what the interpreter
+allocates. The counts are deterministic, the same script with the same input
+always gives the same counts, so they can be compared between versions of the
+interpreter.
+
+    with Stats() as stats:
+        app(source)
+    print(stats.counters["environments"])
+
+Counting hooks into `sys.setprofile` while it's enabled, the interpreter itself
+has no counting code, so it costs nothing when it's disabled. Only the thread that
+enabled it is counted.
+"""
+
+import sys
+import typing as t
+from collections import Counter
+
+from .interpreter.callable import Function
+from .interpreter.environment import Environment
+from .interpreter.interpreter import Interpreter
+from .interpreter.lox_class import Class, ClassInstance
+
+_FUNCTION_CALL = Function.call.__code__
+_BINARY = Interpreter.visit_binary.__code__
+
+# What every call of these counts as
+_LABELS: t.Dict[t.Any, str] = {
+    _FUNCTION_CALL: "lox calls",
+    Environment.__init__.__code__: "environments",
+    Function.bind.__code__: "bound methods",
+    Class.find_method.__code__: "method lookups",
+    ClassInstance.__init__.__code__: "instances",
+}
+# `nodes.binary`, `nodes.call_expr`, `nodes.if_statement`, ...
+_LABELS.update(
+    (method.__code__, "nodes." + name[len("visit_") :])
+    for name, method in vars(Interpreter).items()
+    if name.startswith("visit_")
+)
+
+
+class Stats:
+    def __init__(self):
+        self.counters: t.Counter[str] = Counter()
+        self._previous: t.Any = None
+
+    def start(self):
+        self._previous = sys.getprofile()
+        sys.setprofile(self._count)
+
+    def stop(self):
+        sys.setprofile(self._previous)
+        self._previous = None
+
+    def __enter__(self) -> "Stats":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, frame, event: str, arg: t.Any):
+        if event == "call":
+            label = _LABELS.get(frame.f_code)
+            if label is not None:
+                self.counters[label] += 1
+        elif event == "return" and type(arg) is str:
+            # Strings made by `+` and by natives, literals are made only once
+            code = frame.f_code
+            if code is _BINARY or (
+                code.co_name == "call" and code is not _FUNCTION_CALL
+            ):
+                self.counters["strings"] += 1
+
+    def report(self, file: t.TextIO):
+        """
+        Writes the counters, the node counts last.
+        """
+        print("Execution counters:", file=file)
+        counters = sorted(
+            self.counters.items(),
+            key=lambda item: (item[0].startswith("nodes."), item[0]),
+        )
+        for name, count in counters:
+            print(f"  {name:<32} {count:>12,}", file=file)
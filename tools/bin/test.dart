@@ -297,7 +297,14 @@ class Test {
       if (_customInterpreter != null) ...?_customArguments else ..._suite.args,
       _path
     ];
-    var result = Process.runSync(_customInterpreter ?? _suite.executable, args);
+    var executable = _customInterpreter ?? _suite.executable;
+
+    // A test reads its stdin from `<test>.in` if there is one.
+    var input = p.setExtension(_path, ".in");
+    var result = File(input).existsSync()
+        ? Process.runSync(
+            "sh", ["-c", r'exec "$@" < "$0"', input, executable, ...args])
+        : Process.runSync(executable, args);
 
     // Normalize Windows line endings.
     var outputLines = const LineSplitter().convert(result.stdout as String);